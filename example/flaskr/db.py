@@ -12,7 +12,8 @@ def get_db():
     again.
     """
     if "db" not in g:
-        g.db = sqlite3.connect(current_app.config["DATABASE"], detect_types=sqlite3.PARSE_DECLTYPES)
+        # uri=True so the tests can point DATABASE at a shared in-memory database
+        g.db = sqlite3.connect(current_app.config["DATABASE"], detect_types=sqlite3.PARSE_DECLTYPES, uri=True)
         g.db.row_factory = sqlite3.Row
 
     return g.db
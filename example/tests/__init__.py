@@ -1,15 +1,14 @@
 import unittest
 
+from example.tests.test_auth import TestAuth
+from example.tests.test_blog import TestBlog
+from example.tests.test_db import TestDB
+from example.tests.test_factory import TestConfig, TestHello
+
+_loader = unittest.TestLoader()
+
 
 def suite():
-    from example.tests.test_auth import TestAuth
-    from example.tests.test_blog import TestBlog
-    from example.tests.test_db import TestDB
-    from example.tests.test_factory import TestConfig, TestHello
-    suite = unittest.TestSuite()
-    suite.addTest(unittest.makeSuite(TestAuth))
-    suite.addTest(unittest.makeSuite(TestBlog))
-    suite.addTest(unittest.makeSuite(TestDB))
-    suite.addTest(unittest.makeSuite(TestConfig))
-    suite.addTest(unittest.makeSuite(TestHello))
-    return suite
+    return unittest.TestSuite(
+        [_loader.loadTestsFromTestCase(case) for case in (TestAuth, TestBlog, TestDB, TestConfig, TestHello)]
+    )
@@ -1,51 +1,88 @@
 import os
-import tempfile
-from typing import Iterator
+import sqlite3
+from typing import Iterator, Union
 
 import flask_unittest
 from flask import Flask
 from flask.testing import FlaskClient
 
+from example import flaskr
 from example.flaskr import create_app
 from example.flaskr.db import close_db, get_db
-from example.flaskr.db import init_db
 
 # read in SQL for populating test data
-with open(os.path.join(os.path.dirname(__file__), "data.sql"), "rb") as f:
-    _data_sql = f.read().decode("utf8")
+# both SQL files are plain ASCII, so they are read as text directly
+with open(os.path.join(os.path.dirname(__file__), "data.sql"), "r", encoding="ascii") as f:
+    _data_sql = f.read()
 
+# build the seeded database once - every test gets a page level copy of it
+_template = sqlite3.connect(":memory:")
+with open(os.path.join(os.path.dirname(flaskr.__file__), "schema.sql"), "r", encoding="ascii") as f:
+    _template.executescript(f.read())
+_template.executescript(_data_sql)
+
+
+def _build_app(name) -> Flask:
+    """Create the app with the common test config, and its own database."""
+    # use a named in-memory database to isolate the database of each app
+    # shared cache lets every connection opened with the app see the same data
+    db_uri = "file:flaskrtest_%s?mode=memory&cache=shared" % name
+    return create_app({"TESTING": True, "DATABASE": db_uri})
 
-def _create_app(self) -> Iterator[Flask]:
-    """Create and configure a new app instance for each test."""
-    # create a temporary file to isolate the database for each test
-    db_fd, db_path = tempfile.mkstemp()
-    # create the app with common test config
-    app = create_app({"TESTING": True, "DATABASE": db_path})
 
-    # create the database and load test data
+def _seeded(app: Flask) -> Iterator[Flask]:
+    """Yield the given app with its database freshly seeded."""
+    # load the test data, by cloning the seeded template into the database
     with app.app_context():
-        init_db()
-        get_db().executescript(_data_sql)
+        _template.backup(get_db())
 
         # Yield the app
         '''
-        This can be outside the `with` block too, but we need to 
-        call `close_db` before exiting current context
-        Otherwise windows will have trouble removing the temp file
-        that doesn't happen on unices though, which is nice
+        The connection held by this context keeps the in-memory
+        database alive for the whole test - it must be yielded from
+        inside the `with` block
         '''
         yield app
 
-        ## Close the db
+        ## Close the db - this also discards the in-memory database
         close_db()
 
-    ## Cleanup temp file
-    os.close(db_fd)
-    os.remove(db_path)
+
+def _create_app(self) -> Iterator[Flask]:
+    """Create and configure a new app instance for each test."""
+    yield from _seeded(_build_app(id(self)))
 
 
 class TestBase(flask_unittest.AppClientTestCase):
-    create_app = _create_app
+    """Share one app across all the tests of a class.
+
+    Only the database is reset for each test, by cloning the seeded
+    template into it again. The app is yielded from inside an app
+    context, so the tests can call ``get_db`` directly.
+    """
+
+    shared_app: Union[Flask, None] = None
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.shared_app = _build_app(cls.__name__)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.shared_app = None
+        super().tearDownClass()
+
+    def create_app(self) -> Iterator[Flask]:
+        yield from _seeded(self.shared_app)
+
+    def login_session(self, client: FlaskClient, user_id: int = 1):
+        """Log in as the given user by writing to the session directly.
+
+        This skips the login view, along with the password hash check it does.
+        """
+        with client.session_transaction() as session:
+            session["user_id"] = user_id
 
 
 class AuthActions(object):
@@ -1,11 +1,15 @@
 import unittest
 
+import flask_unittest
+
 from example.tests import suite
 
 
 def run():
     runner = unittest.TextTestRunner(verbosity=2)
-    runner.run(suite())
+    # Every testcase class has its own app, and every test its own in-memory database - the suite shards by
+    # class, across worker processes, so the tests can safely run in parallel
+    runner.run(flask_unittest.ParallelTestSuite(suite()))
 
 
 if __name__ == '__main__':
@@ -1,6 +1,4 @@
 import unittest
-from dataclasses import dataclass
-from typing import ByteString
 
 from flask import Flask
 from flask.testing import FlaskClient
@@ -9,12 +7,19 @@ from flask import g, session
 from example.flaskr.db import get_db
 from example.tests.conftest import AuthActions, TestBase
 
+_AUTH_LOGIN_URL = "http://localhost/auth/login"
+_INDEX_URL = "http://localhost/"
 
-@dataclass
-class AuthParameters:
-    username: str
-    password: str
-    message: ByteString
+# (username, password, expected message) cases for the input validation tests
+_REGISTER_CASES = (
+    ("", "", b"Username is required."),
+    ("a", "", b"Password is required."),
+    ("test", "test", b"already registered"),
+)
+_LOGIN_CASES = (
+    ("a", "test", b"Incorrect username."),
+    ("test", "a", b"Incorrect password."),
+)
 
 
 class TestAuth(TestBase):
@@ -24,20 +29,13 @@ class TestAuth(TestBase):
 
         # test that successful registration redirects to the login page
         response = client.post("/auth/register", data={"username": "a", "password": "a"})
-        self.assertLocationHeader(response, "http://localhost/auth/login")
+        self.assertLocationHeader(response, _AUTH_LOGIN_URL)
 
         # test that the user was inserted into the database
-        with app.app_context():
-            self.assertIsNotNone(get_db().execute("select * from user where username = 'a'").fetchone())
+        self.assertIsNotNone(get_db().execute("select * from user where username = 'a'").fetchone())
 
     def test_register_validate_input(self, _, client: FlaskClient):
-        authparams = [
-            AuthParameters("", "", b"Username is required."),
-            AuthParameters("a", "", b"Password is required."),
-            AuthParameters("test", "test", b"already registered")
-        ]
-        for authparam in authparams:
-            username, password, message = vars(authparam).values()
+        for username, password, message in _REGISTER_CASES:
             response = client.post("/auth/register", data={"username": username, "password": password})
             self.assertInResponse(message, response)
 
@@ -48,7 +46,7 @@ class TestAuth(TestBase):
         # test that successful login redirects to the index page
         auth = AuthActions(client)
         response = auth.login()
-        self.assertLocationHeader(response, "http://localhost/")
+        self.assertLocationHeader(response, _INDEX_URL)
 
         # login request set the user_id in the session
         # check that the user is loaded from the session
@@ -58,12 +56,7 @@ class TestAuth(TestBase):
 
     def test_login_validate_input(self, _, client: FlaskClient):
         auth = AuthActions(client)
-        authparams = [
-            AuthParameters("a", "test", b"Incorrect username."),
-            AuthParameters("test", "a", b"Incorrect password.")
-        ]
-        for authparam in authparams:
-            username, password, message = vars(authparam).values()
+        for username, password, message in _LOGIN_CASES:
             response = auth.login(username, password)
             self.assertInResponse(message, response)
 
@@ -4,7 +4,14 @@ from flask import Flask
 from flask.testing import FlaskClient
 
 from example.flaskr.db import get_db
-from example.tests.conftest import AuthActions, TestBase
+from example.tests.conftest import TestBase
+
+# Endpoints shared by the tests below
+_LOGIN_REQUIRED_PATHS = ("/create", "/1/update", "/1/delete")
+_EXISTS_REQUIRED_PATHS = ("/2/update", "/2/delete")
+_VALIDATED_PATHS = ("/create", "/1/update")
+_AUTH_LOGIN_URL = "http://localhost/auth/login"
+_INDEX_URL = "http://localhost/"
 
 
 class TestBlog(TestBase):
@@ -13,8 +20,7 @@ class TestBlog(TestBase):
         self.assertInResponse(b"Log In", response)
         self.assertInResponse(b"Register", response)
 
-        auth = AuthActions(client)
-        auth.login()
+        self.login_session(client)
         response = client.get("/")
         self.assertInResponse(b"test title", response)
         self.assertInResponse(b"by test on 2018-01-01", response)
@@ -22,19 +28,17 @@ class TestBlog(TestBase):
         self.assertInResponse(b'href="/1/update"', response)
 
     def test_login_required(self, _, client: FlaskClient):
-        for path in ("/create", "/1/update", "/1/delete"):
+        for path in _LOGIN_REQUIRED_PATHS:
             response = client.post(path)
-            self.assertLocationHeader(response, "http://localhost/auth/login")
+            self.assertLocationHeader(response, _AUTH_LOGIN_URL)
 
     def test_author_required(self, app: Flask, client: FlaskClient):
         # change the post author to another user
-        with app.app_context():
-            db = get_db()
-            db.execute("UPDATE post SET author_id = 2 WHERE id = 1")
-            db.commit()
+        db = get_db()
+        db.execute("UPDATE post SET author_id = 2 WHERE id = 1")
+        db.commit()
 
-        auth = AuthActions(client)
-        auth.login()
+        self.login_session(client)
         # current user can't modify other user's post
         self.assertStatus(client.post("/1/update"), 403)
         self.assertStatus(client.post("/1/delete"), 403)
@@ -42,50 +46,42 @@ class TestBlog(TestBase):
         self.assertNotIn(b'href="/1/update"', client.get("/").data)
 
     def test_exists_required(self, _, client: FlaskClient):
-        auth = AuthActions(client)
-        auth.login()
-        for path in ("/2/update", "/2/delete"):
+        self.login_session(client)
+        for path in _EXISTS_REQUIRED_PATHS:
             self.assertStatus(client.post(path), 404)
 
     def test_create(self, app: Flask, client: FlaskClient):
-        auth = AuthActions(client)
-        auth.login()
+        self.login_session(client)
         self.assertStatus(client.get("/create"), 200)
         client.post("/create", data={"title": "created", "body": ""})
 
-        with app.app_context():
-            db = get_db()
-            count = db.execute("SELECT COUNT(id) FROM post").fetchone()[0]
-            self.assertEqual(count, 2)
+        db = get_db()
+        count = db.execute("SELECT COUNT(id) FROM post").fetchone()[0]
+        self.assertEqual(count, 2)
 
     def test_update(self, app: Flask, client: FlaskClient):
-        auth = AuthActions(client)
-        auth.login()
+        self.login_session(client)
         self.assertStatus(client.get("/1/update"), 200)
         client.post("/1/update", data={"title": "updated", "body": ""})
 
-        with app.app_context():
-            db = get_db()
-            post = db.execute("SELECT * FROM post WHERE id = 1").fetchone()
-            self.assertEqual(post["title"], "updated")
+        db = get_db()
+        post = db.execute("SELECT * FROM post WHERE id = 1").fetchone()
+        self.assertEqual(post["title"], "updated")
 
     def test_create_update_validate(self, app: Flask, client: FlaskClient):
-        auth = AuthActions(client)
-        auth.login()
-        for path in ("/create", "/1/update"):
+        self.login_session(client)
+        for path in _VALIDATED_PATHS:
             response = client.post(path, data={"title": "", "body": ""})
             self.assertInResponse(b"Title is required.", response)
 
     def test_delete(self, app: Flask, client: FlaskClient):
-        auth = AuthActions(client)
-        auth.login()
+        self.login_session(client)
         response = client.post("/1/delete")
-        self.assertLocationHeader(response, "http://localhost/")
+        self.assertLocationHeader(response, _INDEX_URL)
 
-        with app.app_context():
-            db = get_db()
-            post = db.execute("SELECT * FROM post WHERE id = 1").fetchone()
-            self.assertIsNone(post)
+        db = get_db()
+        post = db.execute("SELECT * FROM post WHERE id = 1").fetchone()
+        self.assertIsNone(post)
 
 
 if __name__ == '__main__':
@@ -5,16 +5,19 @@ from flask.testing import FlaskClient
 
 from example.flaskr import create_app
 
+# The testing app, built once and shared by all the testcases in this module
+_TEST_APP = create_app({"TESTING": True})
+
 
 class TestConfig(unittest.TestCase):
     def test_config(self):
         """Test create_app without passing test config."""
         self.assertFalse(create_app().testing)
-        self.assertTrue(create_app({"TESTING": True}).testing)
+        self.assertTrue(_TEST_APP.testing)
 
 
 class TestHello(flask_unittest.ClientTestCase):
-    app = create_app({"TESTING": True})
+    app = _TEST_APP
 
     def test_hello(self, client: FlaskClient):
         response = client.get("/hello")
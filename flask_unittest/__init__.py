@@ -1,4 +1,4 @@
 from .case import LiveTestCase, ClientTestCase, AppTestCase, AppClientTestCase
-from .suite import LiveTestSuite
+from .suite import LiveTestSuite, ParallelTestSuite
 from .main import main_live, LiveTestProgram
 from .loader import LiveTestLoader
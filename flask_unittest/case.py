@@ -1,12 +1,21 @@
 import unittest
-import functools
+from contextlib import ExitStack
+from types import MappingProxyType
 from inspect import isgeneratorfunction
-from typing import Callable, Dict, Iterator, Union, Optional
+from typing import Callable, Dict, Iterator, Mapping, Union, Optional
 
 from flask import Flask
 from flask.testing import FlaskClient
 from flask.wrappers import Response
 
+from .utils import _bind, _clear_cookies, _make_test_client
+
+# The default no-op setUp/tearDown methods of the testcases below - filled in once they are defined
+_DEFAULT_HOOKS: frozenset = frozenset()
+
+# Read-only default for `test_client_kwargs` - so it can't be mutated (and shared) by accident
+_EMPTY_KWARGS: Mapping = MappingProxyType({})
+
 
 class LiveTestCase(unittest.TestCase):
     '''
@@ -19,6 +28,8 @@ class LiveTestCase(unittest.TestCase):
     you need
 
     Should be used with LiveTestSuite
+
+    The suite sets `app` and `server_url` on the testcase class as well - so they're available in `setUpClass`
     '''
     app: Union[Flask, None] = None
     server_url: Union[str, None] = None
@@ -39,6 +50,17 @@ class _TestCaseImpl(unittest.TestCase):
     * Wrap the `super().run` and `super().debug` in a `try/finally` block
     * Restore the original setUp, testMethod and tearDown methods in the `finally` block
     '''
+    # Whether or not setUp/tearDown are overridden by the user (and need the resources) - computed once per class
+    _bind_setup: bool = True
+    _bind_teardown: bool = True
+
+    def __init_subclass__(cls, **kwargs):
+        '''
+        Check whether setUp/tearDown are the default (no-op) ones once, when the subclass is created
+        '''
+        super().__init_subclass__(**kwargs)
+        cls._bind_setup = cls.setUp not in _DEFAULT_HOOKS
+        cls._bind_teardown = cls.tearDown not in _DEFAULT_HOOKS
 
     ### Utility functions exposed to the user
 
@@ -71,7 +93,7 @@ class _TestCaseImpl(unittest.TestCase):
         Prepare `super().run` with `result` and pass it to the setup
         This way, the setup can just call `internal_method()` without having to pass `result`
         '''
-        return self._wrap_internal_method_with_custom_setup(functools.partial(super().run, result))
+        return self._wrap_internal_method_with_custom_setup(_bind(super().run, result))
 
     def debug(self):
         '''
@@ -130,9 +152,16 @@ class _TestCaseImpl(unittest.TestCase):
 
         Then cleanup
         '''
+        # The default (no-op) setUp and tearDown don't need the resources, so don't bother binding them
+        bind_setup = self._bind_setup
+        bind_teardown = self._bind_teardown
+        # The bound methods shadow the class' methods through the instance dict directly
+        name = self._testMethodName
+        inst_dict = self.__dict__
         try:
             '''
             Override the method to create a partially built method - pass in the app/client or both (i.e *test_args)
+            This uses a plain closure (`_bind`) - it's cheaper to build and to call than `functools.partial`
 
             `super().run`/`super().debug` can now call this test method without passing anything and it'll all work out
 
@@ -141,22 +170,30 @@ class _TestCaseImpl(unittest.TestCase):
             called directly too
             The preparation is done in `_TestCaseImpl::run` (up above)
             '''
-            setattr(self, self._testMethodName, functools.partial(orig_test, *test_args))
-            # Also override the set up and tear down methods similarly
-            self.setUp = functools.partial(orig_setup, *test_args)
-            self.tearDown = functools.partial(orig_teardown, *test_args)
+            bound_test = inst_dict[name] = _bind(orig_test, *test_args)
+            # unittest looks for the `expectedFailure` marker on the test method it's about to call
+            if getattr(orig_test, '__unittest_expecting_failure__', False):
+                bound_test.__unittest_expecting_failure__ = True
+            # Also override the set up and tear down methods similarly - if they were overridden by the user
+            if bind_setup:
+                inst_dict['setUp'] = _bind(orig_setup, *test_args)
+            if bind_teardown:
+                inst_dict['tearDown'] = _bind(orig_teardown, *test_args)
             # Call the actual test
             return internal_method()
         finally:
-            if hasattr(self, '_teardown_create_app_result'):
+            if create_app_result is not None and hasattr(self, '_teardown_create_app_result'):
                 # If the object has _teardown_create_app_result method - it's a AppTestCase/AppClientTestCase
                 # In which case, handle tearing down the result gotten from `create_app` (should be passed as an arg)
+                # A shared app (`create_app_once`) is not passed here - it's torn down in `tearDownClass`
                 getattr(self, '_teardown_create_app_result')(create_app_result)
 
-            # Restore the original methods
-            setattr(self, self._testMethodName, orig_test)
-            self.setUp = orig_setup
-            self.tearDown = orig_teardown
+            # Restore the original methods - removing the shadowing entries lets the class' methods resurface
+            inst_dict.pop(name, None)
+            if bind_setup:
+                inst_dict.pop('setUp', None)
+            if bind_teardown:
+                inst_dict.pop('tearDown', None)
 
 
 class ClientTestCase(_TestCaseImpl):
@@ -177,22 +214,47 @@ class ClientTestCase(_TestCaseImpl):
     # Whether or not to use cookies in test client
     test_client_use_cookies: bool = True
     # kwargs to pass to test_client function
-    test_client_kwargs: Dict = {}
+    test_client_kwargs: Mapping = _EMPTY_KWARGS
+    # Whether or not to use the same FlaskClient for all the tests in the class
+    # The cookies are cleared after each test
+    share_client_across_tests: bool = False
+    # Handle for the shared FlaskClient - only set while the class is running
+    _shared_client: Union[FlaskClient, None] = None
 
     def __init__(self, methodName='runTest'):
         # Verify self.app was provided
-        if not self.app:
+        if self.app is None:
             raise NotImplementedError('property `app` must be assigned in ClientTestCase')
         # Call the original __init__
         super().__init__(methodName)
 
-    def setUp(self, client: FlaskClient) -> None:
+    @classmethod
+    def setUpClass(cls):
+        '''
+        Create and enter the shared client, if `share_client_across_tests` is set
+        '''
+        super().setUpClass()
+        if cls.share_client_across_tests:
+            cls._shared_client = _make_test_client(cls.app, cls.test_client_use_cookies, cls.test_client_kwargs)
+            cls._shared_client.__enter__()
+
+    @classmethod
+    def tearDownClass(cls):
+        '''
+        Exit the shared client, if there is one
+        '''
+        if cls._shared_client is not None:
+            cls._shared_client.__exit__(None, None, None)
+            cls._shared_client = None
+        super().tearDownClass()
+
+    def setUp(self, client: Optional[FlaskClient] = None) -> None:
         '''
         Set up to do before running each test
         '''
         pass
 
-    def tearDown(self, client: FlaskClient) -> None:
+    def tearDown(self, client: Optional[FlaskClient] = None) -> None:
         '''
         Cleanup to do after running each test
         '''
@@ -205,8 +267,19 @@ class ClientTestCase(_TestCaseImpl):
         ClientTestCase only needs to instantiate the client, in a with block
         Do just that, and pass the client to `_handle_try_finally_around_internal_call`, which will then
         pass it to the actual test method, setUp and tearDown
+
+        If the class shares a client, it's already been entered in `setUpClass` - just pass it along
+        and clear its cookies afterwards, so they don't leak into the next test
         '''
-        with self.app.test_client(self.test_client_use_cookies, **self.test_client_kwargs) as client:
+        client = self._shared_client
+        if client is not None:
+            try:
+                return self._handle_try_finally_around_internal_call(
+                    internal_method, orig_test, orig_setup, orig_teardown, client
+                )
+            finally:
+                _clear_cookies(client)
+        with _make_test_client(self.app, self.test_client_use_cookies, self.test_client_kwargs) as client:
             return self._handle_try_finally_around_internal_call(
                 internal_method, orig_test, orig_setup, orig_teardown, client
             )
@@ -226,6 +299,43 @@ class AppTestCase(_TestCaseImpl):
 
     Can be used with unittest.TestSuite
     '''
+    # Whether or not to call `create_app` only once, in `setUpClass`, and use that app for all the tests in the class
+    create_app_once: bool = False
+    # Whether or not `create_app` is a generator function - computed once per class
+    _create_app_is_gen: bool = False
+    # Handle for the shared app, and the result of `create_app` it came from - only set while the class is running
+    _shared_app: Union[Flask, None] = None
+    _shared_create_app_result: Union[Flask, Iterator[Flask], None] = None
+
+    def __init_subclass__(cls, **kwargs):
+        '''
+        Check whether `create_app` is a generator function once, when the subclass is created
+        The answer never changes for a given class, so there's no need to inspect it for every test
+        '''
+        super().__init_subclass__(**kwargs)
+        cls._create_app_is_gen = isgeneratorfunction(cls.create_app)
+
+    @classmethod
+    def setUpClass(cls):
+        '''
+        Create the shared app, if `create_app_once` is set
+        '''
+        super().setUpClass()
+        if cls.create_app_once:
+            # `create_app` is an instance method - call it through a throwaway instance
+            cls._shared_create_app_result, cls._shared_app = cls()._instantiate_app()
+
+    @classmethod
+    def tearDownClass(cls):
+        '''
+        Tear down the shared app, if there is one
+        '''
+        if cls._shared_app is not None:
+            res = cls._shared_create_app_result
+            cls._shared_create_app_result = cls._shared_app = None
+            cls()._teardown_create_app_result(res)
+        super().tearDownClass()
+
     def create_app(self) -> Union[Flask, Iterator[Flask]]:
         '''
         Should return/yield a built/configured Flask app object
@@ -234,19 +344,19 @@ class AppTestCase(_TestCaseImpl):
         '''
         raise NotImplementedError
 
-    def setUp(self, app: Flask) -> None:
+    def setUp(self, app: Optional[Flask] = None) -> None:
         '''
         Set up to do before
         '''
         pass
 
-    def tearDown(self, app: Flask) -> None:
+    def tearDown(self, app: Optional[Flask] = None) -> None:
         pass
 
     ### Private helper methods
 
     def _instantiate_app(self):
-        if isgeneratorfunction(self.create_app):
+        if self._create_app_is_gen:
             # create_app yields an iterator/generator
             res = self.create_app()
             return res, next(res)
@@ -268,7 +378,13 @@ class AppTestCase(_TestCaseImpl):
         
         Otherwise, the `app` needs to be passed to `_handle_try_finally_around_internal_call`, which will then
         pass it to the actual test method, setUp and tearDown
+
+        If the class shares an app, it's already been created in `setUpClass` - just pass it along
         '''
+        if self._shared_app is not None:
+            return self._handle_try_finally_around_internal_call(
+                internal_method, orig_test, orig_setup, orig_teardown, self._shared_app
+            )
         res, app = self._instantiate_app()
         return self._handle_try_finally_around_internal_call(
             internal_method, orig_test, orig_setup, orig_teardown, app, create_app_result=res
@@ -277,7 +393,7 @@ class AppTestCase(_TestCaseImpl):
     def _teardown_create_app_result(self, res: Union[Flask, Iterator[Flask]]):
         # Tear down the result obtained by calling create_app
         # This is only here to handle when create_app returns a generator/iterator
-        if isinstance(res, Flask):
+        if not self._create_app_is_gen:
             # create_app did not return a generator/iterator - nothing to clean up
             return
         else:
@@ -308,15 +424,15 @@ class AppClientTestCase(AppTestCase):
     # Whether or not to use cookies in test client
     test_client_use_cookies: bool = True
     # kwargs to pass to test_client function
-    test_client_kwargs: Dict = {}
+    test_client_kwargs: Mapping = _EMPTY_KWARGS
 
-    def setUp(self, app: Flask, client: FlaskClient) -> None:
+    def setUp(self, app: Optional[Flask] = None, client: Optional[FlaskClient] = None) -> None:
         '''
         Set up to do before running each test
         '''
         pass
 
-    def tearDown(self, app: Flask, client: FlaskClient) -> None:
+    def tearDown(self, app: Optional[Flask] = None, client: Optional[FlaskClient] = None) -> None:
         '''
         Cleanup to do after running each test
         '''
@@ -331,9 +447,33 @@ class AppClientTestCase(AppTestCase):
         
         The `app` and `client` needs to be passed to `_handle_try_finally_around_internal_call`, which will then
         pass it to the actual test method, setUp and tearDown
+
+        A new client is created for every test, even if the class shares an app
+
+        Both the client and the `create_app` result are cleaned up through a single ExitStack - in reverse order
+        of creation, so the client is closed before the app is torn down
         '''
-        res, app = self._instantiate_app()
-        with app.test_client(use_cookies=self.test_client_use_cookies, **self.test_client_kwargs) as client:
+        with ExitStack() as stack:
+            if self._shared_app is not None:
+                app = self._shared_app
+            else:
+                res, app = self._instantiate_app()
+                stack.callback(self._teardown_create_app_result, res)
+            client = stack.enter_context(
+                _make_test_client(app, self.test_client_use_cookies, self.test_client_kwargs)
+            )
             return self._handle_try_finally_around_internal_call(
-                internal_method, orig_test, orig_setup, orig_teardown, app, client, create_app_result=res
+                internal_method, orig_test, orig_setup, orig_teardown, app, client
             )
+
+
+# The default no-op setUp/tearDown methods of the testcases above
+# They can be called without any arguments, so they are left unbound when not overridden
+# NOTE: The testcases above get `_bind_*` as True, since this is still empty when they are created
+# That's harmless, they're bases to be extended - and their hooks work just as well when bound
+_DEFAULT_HOOKS = frozenset(
+    (
+        ClientTestCase.setUp, ClientTestCase.tearDown, AppTestCase.setUp, AppTestCase.tearDown,
+        AppClientTestCase.setUp, AppClientTestCase.tearDown
+    )
+)
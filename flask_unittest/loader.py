@@ -4,14 +4,11 @@ from typing import Union
 from .suite import LiveTestSuite
 from .utils import _partialclass
 
-# A constant placeholder to signify default timeout parameter
-_GLOBAL_DEFAULT_TIMEOUT = object()
-
 
 class LiveTestLoader(unittest.TestLoader):
     suiteClass = LiveTestSuite
 
-    def __init__(self, flask_app, timeout: Union[float, None] = _GLOBAL_DEFAULT_TIMEOUT):
+    def __init__(self, flask_app, timeout: Union[float, None] = None):
         '''
         Partially construct the TestSuite class
         unittest.TestLoader works with unittest.TestSuite,
@@ -24,13 +21,13 @@ class LiveTestLoader(unittest.TestLoader):
 
         Basically, doing stuff like `self.suiteClass(map(testCaseClass, testCaseNames))`
         (something that is done in unittest.TestLoader) will work perfectly fine because the `flask_app` (also `timeout`)
-        parameter has already been passed to `suiteClass` - but it hasn't been instantiated - it's still a class!
+        parameter has already been passed to `suiteClass` - it just hasn't been called yet
         '''
 
-        self.suiteClass = _partialclass(
-            LiveTestSuite, flask_app, timeout if timeout is not _GLOBAL_DEFAULT_TIMEOUT else None
-        )
+        self.suiteClass = _partialclass(LiveTestSuite, flask_app, timeout)
         super().__init__()
+        # The test method names come from `dir()`, which already sorts them - no need to sort them again
+        self.sortTestMethodsUsing = None
 
 
 # A constant placeholder to signify default live test loader parameter
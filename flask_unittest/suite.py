@@ -1,8 +1,14 @@
+import multiprocessing
+import os
+import pickle
+import sys
 import unittest
 import threading
 import socket
 import time
-from typing import Union, Iterator, Iterable
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Dict, Union, Iterator, Iterable, List, Tuple
+from unittest.result import failfast
 
 from flask import Flask
 
@@ -10,22 +16,29 @@ from .case import LiveTestCase
 
 _TestType = Union[LiveTestCase, unittest.TestSuite]
 
-# A constant placeholder to signify default timeout parameter
-_GLOBAL_DEFAULT_TIMEOUT = object()
-
 # Store localhost as constant
 _LOCALHOST = '127.0.0.1'
 
+# How long to wait for the server to start responding - when no timeout is given (in seconds)
+_DEFAULT_SERVER_STARTUP_TIMEOUT = 10.0
+
 
 class LiveTestSuite(unittest.TestSuite):
+    '''
+    A test suite that runs its (live) tests against a flask server, started on a daemon thread when first run
+
+    `timeout` is how long, in seconds, to wait for the server to start accepting connections - 10 seconds when
+    it's `None` (or 0). It bounds the whole wait, not a single connection attempt. If the server still isn't up
+    by then, `run` raises a `RuntimeError`
+    '''
     # Handle for the flask server
     _thread: Union[threading.Thread, None] = None
 
     def __init__(
-        self, flask_app: Flask, timeout: Union[float, None] = _GLOBAL_DEFAULT_TIMEOUT, tests: Iterable[_TestType] = ()
+        self, flask_app: Flask, timeout: Union[float, None] = None, tests: Iterable[_TestType] = ()
     ):
         self._app = flask_app
-        self._timeout = timeout if timeout is not _GLOBAL_DEFAULT_TIMEOUT else None
+        self._timeout = timeout
         self._host: str = flask_app.config.get('HOST', '127.0.0.1')
         self._port: int = flask_app.config.get('PORT', 5000)
         super().__init__(tests)
@@ -39,13 +52,19 @@ class LiveTestSuite(unittest.TestSuite):
 
     def _setup_testcases(self):
         # Set up required properties in all testcases in current testsuite
+        # Every testcase gets the very same (interned) url string - even across suites
+        server_url = sys.intern(f'http://127.0.0.1:{self._port}')
+        app = self._app
+        isnotsuite = self._isnotsuite
+
         def _inject_properties(testcase: LiveTestCase):
             # Inject the required properties into the given test case
-            testcase.server_url = f'http://127.0.0.1:{self._port}'
-            testcase.app = self._app
+            # Into its class too - so they can also be used in `setUpClass`
+            testcase.server_url = type(testcase).server_url = server_url
+            testcase.app = type(testcase).app = app
 
         for test in self:
-            if self._isnotsuite(test):
+            if isnotsuite(test):
                 _inject_properties(test)
             else:
                 # Current element is an entire suite - iterate through it and add properties to each test
@@ -53,30 +72,42 @@ class LiveTestSuite(unittest.TestSuite):
                     _inject_properties(inner_test)
 
     def _setup_server(self):
+        if self._thread is not None and self._thread.is_alive():
+            # The server was already started by an earlier run of this suite - and it's still up
+            return
         # Spawn the flask server as a separate process
-        self._thread = threading.Thread(target=self._app.run, kwargs={'host': self._host, 'port': self._port, 'use_reloader': False})
-        self._thread.setDaemon(True)
+        self._thread = threading.Thread(
+            target=self._app.run,
+            kwargs={'host': self._host, 'port': self._port, 'use_reloader': False},
+            daemon=True
+        )
         self._thread.start()
         # Wait for the server to start responding, until a specific timeout
+        # Each attempt is kept short and the wait between attempts is backed off exponentially
+        deadline = time.monotonic() + (self._timeout or _DEFAULT_SERVER_STARTUP_TIMEOUT)
+        delay = 0.005
         while True:
+            sckt = socket.socket()
+            sckt.settimeout(0.1)
             try:
-                sckt = socket.create_connection((_LOCALHOST, self._port), timeout=self._timeout or None)
-                sckt.close()
+                sckt.connect((_LOCALHOST, self._port))
                 break
-            except ConnectionRefusedError:
-                time.sleep(.1)
+            except OSError:
+                if time.monotonic() >= deadline:
+                    raise RuntimeError(f'Flask server did not start responding on port {self._port} in time')
+                time.sleep(delay)
+                delay = min(delay * 2, 0.1)
+            finally:
+                sckt.close()
 
     def _isnotsuite(self, test):
         '''
-        A crude way to tell apart testcases and suites with duck-typing
+        Tell apart testcases and suites
 
-        Taken from unittest.TestSuite internals
+        Every suite built by unittest (and flask_unittest) is a unittest.TestSuite - so a type check is enough,
+        no need to duck-type with `iter` (and pay for a raised TypeError on every testcase)
         '''
-        try:
-            iter(test)
-        except TypeError:
-            return True
-        return False
+        return not isinstance(test, unittest.BaseTestSuite)
 
     ### Override the type hints of some derived functions
 
@@ -88,3 +119,312 @@ class LiveTestSuite(unittest.TestSuite):
 
     def __iter__(self) -> Iterator[_TestType]:
         return super().__iter__()
+
+
+class _RemoteFailure(Exception):
+    '''
+    Carries the formatted traceback of an error/failure that happened in a worker process
+    '''
+
+    def __str__(self):
+        return self.args[0]
+
+
+class _RemoteSubTest(unittest.case._SubTest):
+    '''
+    Stands in for a subtest that ran in a worker process - described the same way it was described there
+    '''
+
+    def __init__(self, test_case: unittest.TestCase, description: str):
+        super().__init__(test_case, None, {})
+        self._description = description
+
+    def _subDescription(self):
+        return self._description
+
+
+# The options of the parent's result that also apply to the results in the workers
+_ResultOptions = Tuple[bool, bool, bool]
+
+
+def _result_options(result: unittest.TestResult) -> _ResultOptions:
+    return getattr(result, 'failfast', False), getattr(result, 'buffer', False), getattr(result, 'tb_locals', False)
+
+
+class _ShardResult(unittest.TestResult):
+    '''
+    Records the outcome of every test in a shard as plain (picklable) data
+
+    Each record is a tuple of `(outcome, index, payload)` - where `index` is the position of the test in the shard
+    (or the description of the failed fixture, for outcomes outside of a test) and `payload` is the formatted
+    traceback, or the skip reason (or a tuple of the description and the outcome of a subtest)
+
+    `shouldStop` is backed by the given event - shared by all the shards of a run, so a stop (e.g from `failfast`)
+    in one shard also stops the others
+    '''
+
+    def __init__(
+        self,
+        tests: List[unittest.TestCase],
+        options: _ResultOptions = (False, False, False),
+        stop: Union[threading.Event, None] = None
+    ):
+        self._stop = stop if stop is not None else threading.Event()
+        super().__init__()
+        self.failfast, self.buffer, self.tb_locals = options
+        self._indices = {id(test): i for i, test in enumerate(tests)}
+        self.records: List[tuple] = []
+
+    @property
+    def shouldStop(self) -> bool:
+        return self._stop.is_set()
+
+    @shouldStop.setter
+    def shouldStop(self, value: bool):
+        if value:
+            self._stop.set()
+
+    def _record(self, outcome: str, test, payload: Union[str, None] = None):
+        index = self._indices.get(id(test))
+        self.records.append((outcome, index if index is not None else str(test), payload))
+
+    def addSuccess(self, test):
+        self._record('success', test)
+
+    @failfast
+    def addError(self, test, err):
+        self._record('error', test, self._exc_info_to_string(err, test))
+
+    @failfast
+    def addFailure(self, test, err):
+        self._record('failure', test, self._exc_info_to_string(err, test))
+
+    def addSkip(self, test, reason):
+        self._record('skip', test, reason)
+
+    def addExpectedFailure(self, test, err):
+        self._record('expectedFailure', test, self._exc_info_to_string(err, test))
+
+    @failfast
+    def addUnexpectedSuccess(self, test):
+        self._record('unexpectedSuccess', test)
+
+    def addSubTest(self, test, subtest, err):
+        # Recorded against the parent test - along with the description of the subtest, and how it went
+        if err is None:
+            self._record('subTest', test, (subtest._subDescription(), None, None))
+            return
+        if self.failfast:
+            self.stop()
+        kind = 'failure' if issubclass(err[0], test.failureException) else 'error'
+        self._record('subTest', test, (subtest._subDescription(), kind, self._exc_info_to_string(err, test)))
+
+
+# Result methods that take the (rebuilt) exception info of a recorded outcome
+_REPLAY_METHODS = {'error': 'addError', 'failure': 'addFailure', 'expectedFailure': 'addExpectedFailure'}
+
+# Set in every worker process by `_init_worker` - shared by all the shards of a run
+_worker_stop: Union[threading.Event, None] = None
+
+
+def _init_worker(stop):
+    # Events can only be handed to worker processes when they are started - not through `submit`
+    global _worker_stop
+    _worker_stop = stop
+
+
+def _run_shard(data: bytes, options: _ResultOptions) -> List[tuple]:
+    # Run the given (pickled) tests inside a worker process - a plain suite takes care of the class and module fixtures
+    tests = pickle.loads(data)
+    result = _ShardResult(tests, options, _worker_stop)
+    unittest.TestSuite(tests).run(result)
+    return result.records
+
+
+def _iter_tests(suite: unittest.TestSuite) -> Iterator[unittest.TestCase]:
+    # Flatten the given suite into its testcases
+    for test in suite:
+        if isinstance(test, unittest.TestSuite):
+            yield from _iter_tests(test)
+        else:
+            yield test
+
+
+def _run_live_shard(suites: List[LiveTestSuite], options: _ResultOptions,
+                    stop: threading.Event) -> Tuple[List[unittest.TestCase], List[tuple]]:
+    # Run the given live suites one after the other, on a worker thread - they all use the same port
+    tests = [test for suite in suites for test in _iter_tests(suite)]
+    result = _ShardResult(tests, options, stop)
+    for suite in suites:
+        suite.run(result)
+    return tests, result.records
+
+
+class ParallelTestSuite(unittest.TestSuite):
+    '''
+    A test suite that shards its tests across worker processes
+
+    Tests of the same class are kept in the same shard, so `setUpClass` and `tearDownClass` still run once per
+    shard. Every worker process has its own copy of the apps and clients - this is safe for the `ClientTestCase`,
+    `AppTestCase` and `AppClientTestCase` families, all of which produce per-test state
+
+    Live tests share the server of their `LiveTestSuite` - so they are run in the current process. `LiveTestSuite`s
+    with different ports are run concurrently though, one thread per port - live tests mostly wait on the network
+    (and the browser), so threads are enough. Suites using the same port (and lone `LiveTestCase`s) run serially
+    A testcase class must only be in the suites of one port then - since `app` and `server_url` are set on the
+    class, a `ValueError` is raised otherwise
+
+    The `failfast`, `buffer` and `tb_locals` options of the result are applied in the workers too - and a stop
+    in one shard stops the others (once their current test is done). Shards (i.e tests) that can't be pickled are
+    run in the current process instead. Some differences from a plain `unittest.TestSuite` remain though-
+    * Outcomes are reported once a shard is done, shard by shard - not in the order of the suite
+    * Tracebacks are reported as formatted text, the exceptions themselves stay in the workers
+    * Anything set up at module or class level is set up once per worker, not once per run
+    '''
+
+    def __init__(self, tests: Iterable[_TestType] = (), processes: Union[int, None] = None):
+        # Leave a couple of cores free for the OS and the parent process
+        self._processes = processes or max(1, (os.cpu_count() or 1) - 2)
+        super().__init__(tests)
+
+    def run(self, result, debug=False):
+        if debug:
+            # Debugging has to happen in this process
+            return super().run(result, debug)
+        parallel, serial = self._partition_tests(self)
+        shards = self._make_shards(parallel)
+        if len(shards) < 2 or result.shouldStop:
+            # No point spawning workers - run them in this process
+            serial = parallel + serial
+        else:
+            serial = self._run_shards(shards, result) + serial
+        serial = self._run_live_suites(serial, result)
+        # A plain suite takes care of the class and module fixtures (and of `shouldStop`)
+        return unittest.TestSuite(serial).run(result)
+
+    ### Private helper methods
+
+    def _partition_tests(self, suite) -> Tuple[List[unittest.TestCase], List[_TestType]]:
+        # Split the (flattened) tests into those that can be sent to a worker, and those that must run in-process
+        parallel, serial = [], []
+        for test in suite:
+            if isinstance(test, (LiveTestCase, LiveTestSuite)):
+                serial.append(test)
+            elif isinstance(test, unittest.TestCase):
+                parallel.append(test)
+            elif isinstance(test, unittest.TestSuite):
+                inner_parallel, inner_serial = self._partition_tests(test)
+                parallel.extend(inner_parallel)
+                serial.extend(inner_serial)
+            else:
+                # Unknown test-like callable - play it safe
+                serial.append(test)
+        return parallel, serial
+
+    def _run_shards(self, shards: List[List[unittest.TestCase]], result) -> List[unittest.TestCase]:
+        # Run the given shards in worker processes - returns the tests that couldn't be sent to a worker
+        # Pickle the shards up front - so only a failure to pickle a shard sends it back to this process
+        # Any error raised by the workers themselves (e.g a BrokenProcessPool) is left to propagate
+        sendable, unpicklable = [], []
+        for shard in shards:
+            try:
+                sendable.append((shard, pickle.dumps(shard)))
+            except (pickle.PicklingError, TypeError, AttributeError):
+                unpicklable.extend(shard)
+        if not sendable:
+            return unpicklable
+        options = _result_options(result)
+        stop = multiprocessing.Event()
+        with ProcessPoolExecutor(max_workers=len(sendable), initializer=_init_worker, initargs=(stop, )) as pool:
+            futures = [pool.submit(_run_shard, data, options) for _, data in sendable]
+            for (shard, _), future in zip(sendable, futures):
+                self._replay_records(shard, future.result(), result)
+        if stop.is_set():
+            result.stop()
+        return unpicklable
+
+    def _run_live_suites(self, tests: List[_TestType], result) -> List[_TestType]:
+        # Run the live suites of the given tests concurrently, one thread per port - returns the tests left to run
+        by_port: Dict[int, List[LiveTestSuite]] = {}
+        for test in tests:
+            if isinstance(test, LiveTestSuite):
+                by_port.setdefault(test._port, []).append(test)
+        if len(by_port) < 2 or result.shouldStop:
+            return tests
+        self._check_live_classes(by_port)
+        options = _result_options(result)
+        stop = threading.Event()
+        with ThreadPoolExecutor(max_workers=len(by_port)) as pool:
+            futures = [pool.submit(_run_live_shard, suites, options, stop) for suites in by_port.values()]
+            for future in futures:
+                self._replay_records(*future.result(), result)
+        if stop.is_set():
+            result.stop()
+        return [test for test in tests if not isinstance(test, LiveTestSuite)]
+
+    def _check_live_classes(self, by_port: Dict[int, List[LiveTestSuite]]):
+        # The suites set `app` and `server_url` on the testcase classes (for `setUpClass`) - if a class was in the
+        # suites of two ports running at once, its tests could end up with the others' server
+        ports: Dict[type, int] = {}
+        for port, suites in by_port.items():
+            for test in (test for suite in suites for test in _iter_tests(suite)):
+                other = ports.setdefault(type(test), port)
+                if other != port:
+                    raise ValueError(
+                        f'{type(test).__qualname__} is in the live suites of both port {other} and port {port} - '
+                        'a testcase class can only be in the live suites of one port, when they run side by side'
+                    )
+
+    def _make_shards(self, tests: List[unittest.TestCase]) -> List[List[unittest.TestCase]]:
+        # Group the tests by class, then hand out the (largest first) groups to the least loaded shard
+        groups = {}
+        for test in tests:
+            groups.setdefault(type(test), []).append(test)
+        shards = [[] for _ in range(min(self._processes, len(groups)))]
+        for group in sorted(groups.values(), key=len, reverse=True):
+            min(shards, key=len).extend(group)
+        return shards
+
+    def _replay_records(self, shard: List[unittest.TestCase], records: List[tuple], result: unittest.TestResult):
+        # Report the outcomes recorded by a worker through the parent's result object
+        current = None
+        for outcome, index, payload in records:
+            if isinstance(index, str):
+                # Error (or skip) in a class/module fixture, not tied to any test in the shard
+                holder = unittest.suite._ErrorHolder(index)
+                if outcome == 'skip':
+                    result.addSkip(holder, payload)
+                else:
+                    result.addError(holder, (_RemoteFailure, _RemoteFailure(payload), None))
+                continue
+            test = shard[index]
+            if test is not current:
+                # The records of a test are contiguous - so a new test means the previous one is done
+                if current is not None:
+                    result.stopTest(current)
+                current = test
+                result.startTest(test)
+            if outcome == 'success':
+                result.addSuccess(test)
+            elif outcome == 'skip':
+                result.addSkip(test, payload)
+            elif outcome == 'unexpectedSuccess':
+                result.addUnexpectedSuccess(test)
+            elif outcome == 'subTest':
+                description, kind, traceback = payload
+                err = None
+                if kind is not None:
+                    exctype = self._remote_exception(test, kind)
+                    err = (exctype, exctype(traceback), None)
+                result.addSubTest(test, _RemoteSubTest(test, description), err)
+            else:
+                err = (_RemoteFailure, _RemoteFailure(payload), None)
+                getattr(result, _REPLAY_METHODS[outcome])(test, err)
+        if current is not None:
+            result.stopTest(current)
+
+    def _remote_exception(self, test: unittest.TestCase, kind: str) -> type:
+        # The result tells failed subtests from errored ones by the type of the exception
+        if kind == 'failure':
+            return type(_RemoteFailure.__name__, (_RemoteFailure, test.failureException), {})
+        return _RemoteFailure
@@ -1,15 +1,54 @@
-import functools
+from typing import Callable, Mapping
 
+from flask import Flask
+from flask.testing import FlaskClient
 
-def _partialclass(cls, *args, **kwds):
+
+def _partialclass(cls, *args, **kwds) -> Callable:
+    '''
+    Return a function that constructs `cls` with the given args (and kwargs) bound in front
+
+    Like `functools.partial(cls, ...)` - the result is a plain function, not a class, so it can't be
+    subclassed or used with `isinstance`. Calling it is all `unittest.TestLoader` does with its `suiteClass`
+    '''
+    return lambda *a, **kw: cls(*args, *a, **kwds, **kw)
+
+
+def _bind(fn: Callable, *args) -> Callable:
     '''
-    Return a partially constructed class from given class
+    Return `fn` with the given args bound in front - like `functools.partial`
 
-    Essentially the same `functools.partial` but for classes
-    
-    from: https://stackoverflow.com/a/38911383/10305477
+    The args are captured in closure cells, which avoids the tuple packing and kwargs merging
+    `functools.partial` does on every construction and call
+    The testcases only ever bind 1 (app/client) or 2 (app and client) args
     '''
-    class NewCls(cls):
-        __init__ = functools.partialmethod(cls.__init__, *args, **kwds)
+    if len(args) == 1:
+        arg, = args
+        return lambda *a, **kw: fn(arg, *a, **kw)
+    if len(args) == 2:
+        first, second = args
+        return lambda *a, **kw: fn(first, second, *a, **kw)
+    return lambda *a, **kw: fn(*args, *a, **kw)
 
-    return NewCls
+
+def _clear_cookies(client: FlaskClient):
+    '''
+    Clear all the cookies stored in the given client
+
+    Newer werkzeug versions store the cookies in a plain dict, instead of a cookie jar
+    '''
+    if getattr(client, 'cookie_jar', None) is not None:
+        client.cookie_jar.clear()
+    elif getattr(client, '_cookies', None) is not None:
+        client._cookies.clear()
+
+
+def _make_test_client(app: Flask, use_cookies: bool, kwargs: Mapping) -> FlaskClient:
+    '''
+    Create a test client from the given app - passing the extra kwargs only if there are any
+
+    `kwargs` is almost always the default empty dict, so skip the `**kwargs` unpacking in that case
+    '''
+    if kwargs:
+        return app.test_client(use_cookies, **kwargs)
+    return app.test_client(use_cookies)
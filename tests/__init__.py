@@ -1,32 +1,31 @@
 import unittest
+import zlib
 
-import flask_unittest
 
-
-def livesuite():
+def livesuite(shards: int = 1):
+    # Spread the live testcases over the given number of LiveTestSuites - each with its own app (and port)
+    # Wrapped in a flask_unittest.ParallelTestSuite, the suites run side by side - one browser per testcase
+    import flask_unittest
     from tests.flask_live_test import TestSetup, TestIndex, TestAuth, TestBlog
     from tests.app_factory import build_app
-    suite = flask_unittest.LiveTestSuite(build_app())
-    suite.addTest(unittest.makeSuite(TestSetup))
-    suite.addTest(unittest.makeSuite(TestIndex))
-    suite.addTest(unittest.makeSuite(TestAuth))
-    suite.addTest(unittest.makeSuite(TestBlog))
-    return suite
+    loader = unittest.TestLoader()
+    livesuites = [
+        flask_unittest.LiveTestSuite(build_app({'TESTING': True, 'PORT': 5000 + shard})) for shard in range(shards)
+    ]
+    for testcase in (TestSetup, TestIndex, TestAuth, TestBlog):
+        # Assign by (stable) hash of the name - the same testcase always lands on the same port
+        shard = zlib.crc32(testcase.__qualname__.encode()) % shards
+        livesuites[shard].addTest(loader.loadTestsFromTestCase(testcase))
+    return unittest.TestSuite(suite for suite in livesuites if suite.countTestCases())
 
 
 def normalsuite():
-    from tests import flask_app_test, flask_appclient_test, flask_client_test
+    from tests import flask_app_test, flask_appclient_test, flask_client_test, flask_parallel_test
+    loader = unittest.TestLoader()
     suite = unittest.TestSuite()
-    suite.addTest(unittest.makeSuite(flask_app_test.TestSetup))
-    suite.addTest(unittest.makeSuite(flask_app_test.TestGlobals))
-    suite.addTest(unittest.makeSuite(flask_appclient_test.TestSetup))
-    suite.addTest(unittest.makeSuite(flask_appclient_test.TestGlobals))
-    suite.addTest(unittest.makeSuite(flask_appclient_test.TestIndex))
-    suite.addTest(unittest.makeSuite(flask_appclient_test.TestAuth))
-    suite.addTest(unittest.makeSuite(flask_appclient_test.TestBlog))
-    suite.addTest(unittest.makeSuite(flask_client_test.TestSetup))
-    suite.addTest(unittest.makeSuite(flask_client_test.TestGlobals))
-    suite.addTest(unittest.makeSuite(flask_client_test.TestIndex))
-    suite.addTest(unittest.makeSuite(flask_client_test.TestAuth))
-    suite.addTest(unittest.makeSuite(flask_client_test.TestBlog))
+    suite.addTests(loader.loadTestsFromModule(flask_app_test))
+    suite.addTests(loader.loadTestsFromModule(flask_appclient_test))
+    suite.addTests(loader.loadTestsFromModule(flask_client_test))
+    # The other testcases in this module are only meant to be run by TestParallelSuite itself
+    suite.addTests(loader.loadTestsFromTestCase(flask_parallel_test.TestParallelSuite))
     return suite
@@ -0,0 +1,121 @@
+from functools import lru_cache
+from urllib.parse import urlencode
+
+from flask.testing import FlaskClient
+from flask.wrappers import Response
+from lxml import etree, html
+
+from example.flaskr.db import get_db
+from tests.mockdata import MockUser
+
+# Nav links (and the logged in username) checked by the helpers and tests - compiled once, instead of on every call
+XPATH_LOGOUT_LINK = etree.XPath('//a[@href="/auth/logout"]')
+XPATH_DELETE_LINK = etree.XPath('//a[@href="/auth/delete"]')
+XPATH_REGISTER_LINK = etree.XPath('//a[@href="/auth/register"]')
+XPATH_LOGIN_LINK = etree.XPath('//a[@href="/auth/login"]')
+# Same as the CSS `ul > li:nth-child(1) > span`
+XPATH_USERNAME = etree.XPath('//ul/*[1][self::li]/span')
+
+# Contents of the page's <title>
+XPATH_TITLE = etree.XPath('string(//title)')
+
+# Content type of the bodies built by `form_body`
+FORM_CONTENT_TYPE = 'application/x-www-form-urlencoded'
+
+
+@lru_cache(maxsize=None)
+def form_body(**fields: str) -> bytes:
+    # Url encode the given form fields only once - the tests keep posting the same few forms
+    # Post the result with `content_type=FORM_CONTENT_TYPE`, so werkzeug uses it as is
+    return urlencode(fields).encode()
+
+
+def page_tree(rv: Response) -> html.HtmlElement:
+    # Parse the html of the given response (with lxml) only once, no matter how many helpers look at it
+    tree = getattr(rv, '_tree', None)
+    if tree is None:
+        tree = rv._tree = html.fromstring(rv.get_data())
+    return tree
+
+
+class AuthHelpersMixin:
+    '''
+    Helper functions to sign up, log in, log out and delete accounts through a FlaskClient
+
+    Shared by the base testcases of `flask_app_test.py`, `flask_client_test.py` and `flask_appclient_test.py`
+    Meant to be mixed into a unittest.TestCase, the helpers use its assert methods
+    '''
+
+    def signup(self, client: FlaskClient, username: str, password: str, expect_success: bool = True):
+        # Sign up with given credentials
+        # No need to follow the redirect (and render the log in page) - the redirect itself says it all
+        rv: Response = client.post(
+            '/auth/register', data=form_body(username=username, password=password), content_type=FORM_CONTENT_TYPE
+        )
+
+        # Make sure the signup redirects to the log in page - only if the signup was supposed to succeed
+        self.assertEqual(expect_success, rv.status_code == 302)
+        if expect_success:
+            self.assertTrue(rv.headers['Location'].endswith('/auth/login'))
+
+    def login(self, client: FlaskClient, username: str, password: str, expect_success: bool = True):
+        # Log in with given credentials
+        rv: Response = client.post(
+            '/auth/login',
+            data=form_body(username=username, password=password),
+            content_type=FORM_CONTENT_TYPE,
+            follow_redirects=True
+        )
+
+        # Make sure the Posts page is showing - only if the login was supposed to succeed
+        tree = page_tree(rv)
+        self.assertEqual(expect_success, 'Posts' in XPATH_TITLE(tree))
+        if not expect_success:
+            return
+        # Make sure login suceeded and the authorized links are showing
+        self.assertTrue(XPATH_LOGOUT_LINK(tree))
+        self.assertTrue(XPATH_DELETE_LINK(tree))
+
+    def logout(self, client: FlaskClient) -> Response:
+        # Logs out of the signed in account
+        # Returns the (logged out) index page the logout redirects to
+        rv: Response = client.get('/auth/logout', follow_redirects=True)
+
+        # Make sure the Posts page is showing
+        tree = page_tree(rv)
+        self.assertIn('Posts', XPATH_TITLE(tree))
+        # Make sure logout suceeded and the non-authorized links are showing
+        self.assertTrue(XPATH_REGISTER_LINK(tree))
+        self.assertTrue(XPATH_LOGIN_LINK(tree))
+        return rv
+
+    def delete(self, client: FlaskClient):
+        # Deletes the signed in account
+        rv: Response = client.post('/auth/delete', follow_redirects=True)
+
+        # Make sure the Posts page is showing
+        tree = page_tree(rv)
+        self.assertIn('Posts', XPATH_TITLE(tree))
+        # Make sure delete suceeded and the non-authorized links are showing
+        self.assertTrue(XPATH_REGISTER_LINK(tree))
+        self.assertTrue(XPATH_LOGIN_LINK(tree))
+
+    def _prime_user(self, client: FlaskClient):
+        # Log in directly (see `_session_login`), then populate the flask globals
+        self._session_login(client)
+        # Visit the index page, so the request/session/g globals are populated
+        client.get('/')
+
+    def _session_login(self, client: FlaskClient):
+        # Log in without going through the register/login views - insert the account and write the session directly
+        # NOTE: The password is stored as is, not hashed (hashing is slow on purpose) - so the account can only be used
+        # through the session, the login view won't accept it (not even with `fast_password_hashing` patched in)
+        with client.application.app_context():
+            db = get_db()
+            db.execute(
+                'INSERT OR IGNORE INTO user (username, password) VALUES (?, ?)', (MockUser.username, MockUser.password)
+            )
+            db.commit()
+            user_id = db.execute('SELECT id FROM user WHERE username = ?', (MockUser.username, )).fetchone()['id']
+        with client.session_transaction() as sess:
+            sess['user_id'] = user_id
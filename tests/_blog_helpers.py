@@ -0,0 +1,87 @@
+from typing import Union
+
+from flask.testing import FlaskClient
+from flask.wrappers import Response
+from lxml import etree
+
+from tests._auth_helpers import FORM_CONTENT_TYPE, form_body, page_tree
+
+# XPath equivalent of the CSS `article.post` - matches the `post` class itself, not just any class containing it
+_XPATH_POST = '//article[contains(concat(" ", normalize-space(@class), " "), " post ")]'
+
+# Titles and bodies of all the posts on a page - for the post checks, which only need these two lists
+# Same as the CSS `article.post > header > div > h1` and `article.post > p`, translated (and compiled) only once
+XPATH_POST_TITLES = etree.XPath(_XPATH_POST + '/header/div/h1')
+XPATH_POST_BODIES = etree.XPath(_XPATH_POST + '/p')
+
+# Edit link(s) of the post(s) with the given title (`$title`) - the filtering is all done by lxml
+XPATH_POST_EDIT_LINK = etree.XPath(_XPATH_POST + '/header[div/h1[normalize-space(.) = $title]]/a/@href')
+
+
+class BlogHelpersMixin:
+    '''
+    Helper functions to create, edit and delete blog posts through a FlaskClient - and to look them up in a page
+
+    Shared by the `TestBlog` testcases of `flask_client_test.py` and `flask_appclient_test.py`
+    Meant to be mixed into a unittest.TestCase, the helpers use its assert methods
+    '''
+
+    def get_post_edit_link(self, rv: Response, title: str) -> Union[str, None]:
+        # Find the edit link (the anchor tag in the header) of the post that has the correct title
+        # Returns None if there's no such post, or it has no edit link
+        hrefs = XPATH_POST_EDIT_LINK(page_tree(rv), title=title)
+        return hrefs[0] if hrefs else None
+
+    def get_post_delete_link(self, rv: Response, title: str) -> str:
+        # The delete link is just the same as the edit (i.e `update`) link, with the `update` replaced with `delete`
+        return self.get_post_edit_link(rv, title).replace('/update', '/delete')
+
+    def verify_post_exists(self, rv: Response, title: str, body: str, expect_success: bool = True):
+        # Make sure the given post exists in the given response html - or doesn't, if `expect_success` is False
+        tree = page_tree(rv)
+        post_titles = [h1.text_content() for h1 in XPATH_POST_TITLES(tree)]
+        if not expect_success:
+            self.assertNotIn(title, post_titles)
+            return
+        self.assertIn(title, post_titles)
+        post_bodies = [p.text_content() for p in XPATH_POST_BODIES(tree)]
+        self.assertIn(body, post_bodies)
+
+    def create_post(self, client: FlaskClient, title: str, body: str) -> Response:
+        # Creates a post and verifies its presence on the index page
+        # Returns that index page, so the next helper doesn't have to fetch it again
+        rv: Response = client.post(
+            '/create', data=form_body(title=title, body=body), content_type=FORM_CONTENT_TYPE, follow_redirects=True
+        )
+        # Make sure the post creation was succesful and the new post is present on the index page
+        self.verify_post_exists(rv, title, body)
+        return rv
+
+    def edit_post(
+        self, client: FlaskClient, old_title: str, new_title: str, new_body: str, index: Union[Response, None] = None
+    ):
+        # Go to the index page to find the post - unless an up to date one was passed in
+        rv: Response = index if index is not None else client.get('/')
+
+        # Get the edit link from the response html
+        edit_link = self.get_post_edit_link(rv, old_title)
+        rv: Response = client.post(
+            edit_link,
+            data=form_body(title=new_title, body=new_body),
+            content_type=FORM_CONTENT_TYPE,
+            follow_redirects=True
+        )
+
+        # Make sure the post edit was succesful and the new post is present on the index page
+        self.verify_post_exists(rv, new_title, new_body)
+
+    def delete_post(self, client: FlaskClient, title: str, body: str, index: Union[Response, None] = None):
+        # Go to the index page to find the post - unless an up to date one was passed in
+        rv: Response = index if index is not None else client.get('/')
+
+        # Get the delete link from the response html
+        delete_link = self.get_post_delete_link(rv, title)
+        rv: Response = client.post(delete_link, follow_redirects=True)
+
+        # Make sure the post edit was succesful and the post has been deleted from the index page
+        self.verify_post_exists(rv, title, body, expect_success=False)
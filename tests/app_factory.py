@@ -1,12 +1,67 @@
+import sqlite3
+from unittest import mock
+from functools import lru_cache
+from itertools import count
+from typing import Dict, FrozenSet, Tuple, Union
+
+from flask import Flask
+
 from example.flaskr import create_app
 from example.flaskr.db import init_db
 
+# Config used by the test apps, frozen so it can be used as a cache key
+_TESTING_CONFIG: FrozenSet[Tuple[str, object]] = frozenset({'TESTING': True}.items())
 
-def build_app():
-    # Create and set up the app
-    # Do all the app config + pre launch setup here
-    app = create_app({'TESTING': True})
-    # Set up the database - this also drops existing tables
+# Gives every built app its own (named) in-memory database
+_db_ids = count()
+
+
+def _make_template_db() -> sqlite3.Connection:
+    # Run flaskr's schema only once - every app built afterwards gets a copy of the resulting database
+    uri = 'file:flaskr_test_template?mode=memory&cache=shared'
+    template = sqlite3.connect(uri, uri=True)
+    app = create_app({'TESTING': True, 'DATABASE': uri})
     with app.app_context():
         init_db()
+    return template
+
+
+_TEMPLATE_DB = _make_template_db()
+
+
+def build_app(test_config: Union[Dict, None] = None) -> Flask:
+    # Create and set up the app
+    # Do all the app config + pre launch setup here
+    test_config = dict(test_config if test_config is not None else {'TESTING': True})
+    # Keep the database in memory, shared by all the connections (and threads) of this app
+    test_config.setdefault('DATABASE', f'file:flaskr_test_{next(_db_ids)}?mode=memory&cache=shared')
+    app = create_app(test_config)
+    # A shared in-memory database is dropped as soon as its last connection closes
+    # `get_db` connections only last for an app context - so keep one open for as long as the app is around
+    keepalive = app.extensions['flaskr_test_db_keepalive'] = sqlite3.connect(app.config['DATABASE'], uri=True)
+    # Set up the database by copying the template over it - this also replaces existing tables
+    _TEMPLATE_DB.backup(keepalive)
     return app
+
+
+def reset_db(app: Flask):
+    # Put the app's database back to its freshly built state - cheaper than undoing each test's changes over HTTP
+    # (A SAVEPOINT can't do this - every request uses its own connection, and flaskr commits its changes)
+    _TEMPLATE_DB.backup(app.extensions['flaskr_test_db_keepalive'])
+
+
+@lru_cache(maxsize=None)
+def get_app(frozen_cfg: FrozenSet[Tuple[str, object]] = _TESTING_CONFIG) -> Flask:
+    # Build the app for the given (frozen) config only once, and hand out that same app afterwards
+    # Useful for testcases that don't need a freshly set up app (and database) each time
+    return build_app(dict(frozen_cfg))
+
+
+def fast_password_hashing():
+    # Patch flaskr's password hashing (pbkdf2 - slow on purpose) with a plain string prefix and compare
+    # Start the returned patcher in `setUpClass` and stop it in `tearDownClass`
+    return mock.patch.multiple(
+        'example.flaskr.auth',
+        generate_password_hash=lambda password, **kwargs: 'plain$' + password,
+        check_password_hash=lambda pwhash, password: pwhash == 'plain$' + password
+    )
@@ -1,17 +1,18 @@
 import unittest
+from typing import Iterator, Union
 
 import flask_unittest
 from flask import Flask
 from flask.testing import FlaskClient
-from flask.wrappers import Response
 from flask.globals import g, session, request
-from bs4 import BeautifulSoup
+from flask_unittest.utils import _clear_cookies
 
-from tests.app_factory import build_app
+from tests._auth_helpers import AuthHelpersMixin
+from tests.app_factory import build_app, fast_password_hashing, get_app, reset_db
 from tests.mockdata import MockUser
 
 
-class _TestBase(flask_unittest.AppTestCase):
+class _TestBase(AuthHelpersMixin, flask_unittest.AppTestCase):
     '''
     Base AppTestCase with helper functions used across other testcases
 
@@ -20,54 +21,19 @@ class _TestBase(flask_unittest.AppTestCase):
     As long as your testcase class extends flask_unittest.AppTestCase - it's fine
     '''
     def create_app(self) -> Flask:
-        return build_app()
-
-    ### Helper functions (not mandatory)
-
-    def signup(self, client: FlaskClient, username: str, password: str):
-        # Sign up with given credentials
-        rv: Response = client.post(
-            '/auth/register', data={'username': username, 'password': password}, follow_redirects=True
-        )
-        soup = BeautifulSoup(rv.data, 'html.parser')
-
-        # Make sure the log in page is showing
-        self.assertIn('Log In', soup.find('title').text)
-
-    def login(self, client: FlaskClient, username: str, password: str):
-        # Log in with given credentials
-        rv: Response = client.post(
-            '/auth/login', data={'username': username, 'password': password}, follow_redirects=True
-        )
-        soup = BeautifulSoup(rv.data, 'html.parser')
-
-        # Make sure the Posts page is showing
-        self.assertIn('Posts', soup.find('title').text)
-        # Make sure login suceeded and the authorized links are showing
-        self.assertTrue(soup.select('a[href="/auth/logout"]'))
-        self.assertTrue(soup.select('a[href="/auth/delete"]'))
-
-    def logout(self, client: FlaskClient):
-        # Logs out of the signed in account
-        rv: Response = client.get('/auth/logout', follow_redirects=True)
-        soup = BeautifulSoup(rv.data, 'html.parser')
-
-        # Make sure the Posts page is showing
-        self.assertIn('Posts', soup.find('title').text)
-        # Make sure logout suceeded and the non-authorized links are showing
-        self.assertTrue(soup.select('a[href="/auth/register"]'))
-        self.assertTrue(soup.select('a[href="/auth/login"]'))
-
-    def delete(self, client: FlaskClient):
-        # Deletes the signed in account
-        rv: Response = client.post('/auth/delete', follow_redirects=True)
-        soup = BeautifulSoup(rv.data, 'html.parser')
-
-        # Make sure the Posts page is showing
-        self.assertIn('Posts', soup.find('title').text)
-        # Make sure delete suceeded and the non-authorized links are showing
-        self.assertTrue(soup.select('a[href="/auth/register"]'))
-        self.assertTrue(soup.select('a[href="/auth/login"]'))
+        return get_app()
+
+    @classmethod
+    def setUpClass(cls):
+        # Skip the (slow) password hashing done by the signup/login helpers
+        super().setUpClass()
+        cls._hashing_patcher = fast_password_hashing()
+        cls._hashing_patcher.start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls._hashing_patcher.stop()
+        super().tearDownClass()
 
 
 class TestSetup(_TestBase):
@@ -103,36 +69,54 @@ class TestGlobals(_TestBase):
 
     Also use the test_request_context as an example of practical use
     of the app object
+
+    The tests share a single client, entered once for the whole testcase - `create_app` hands out
+    the same (cached) app every time, so the client always matches the `app` passed to the tests
     '''
+    _client: Union[FlaskClient, None] = None
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls._client = cls().create_app().test_client()
+        cls._client.__enter__()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls._client.__exit__(None, None, None)
+        cls._client = None
+        super().tearDownClass()
+
+    ### setUp and tearDown methods per testcase (not mandatory) - should have app as a parameter
+
+    def tearDown(self, app: Flask):
+        # Throw away the user created by the test and log the shared client out
+        reset_db(app)
+        _clear_cookies(self._client)
 
     ### Test methods (mandatory, obviously) - should have app as a parameter
 
     def test_session(self, app: Flask):
         # Make sure the session global is accessible and has correct values
-        with app.test_client() as client:
-            self.signup(client, MockUser.username, MockUser.password)
-            self.login(client, MockUser.username, MockUser.password)
-            # Make sure the user_id is visible in session
-            self.assertTrue('user_id' in session)
-            self.delete(client)
+        # The shared client is logged out (in `tearDown`) at the end of each test
+        client = self._client
+        self._prime_user(client)
+        # Make sure the user_id is visible in session
+        self.assertTrue('user_id' in session)
 
     def test_request(self, app: Flask):
         # Make sure the request global is accessible and has correct values
-        with app.test_client() as client:
-            self.signup(client, MockUser.username, MockUser.password)
-            self.login(client, MockUser.username, MockUser.password)
-            # Make sure the request is at the correct endpoint
-            self.assertEqual(request.endpoint, 'blog.index')
-            self.delete(client)
+        client = self._client
+        self._prime_user(client)
+        # Make sure the request is at the correct endpoint
+        self.assertEqual(request.endpoint, 'blog.index')
 
     def test_g(self, app: Flask):
         # Make sure the g object is accessible and has correct values
-        with app.test_client() as client:
-            self.signup(client, MockUser.username, MockUser.password)
-            self.login(client, MockUser.username, MockUser.password)
-            # Make sure the g object has the correct user assigned
-            self.assertEqual(g.user['username'], MockUser.username)
-            self.delete(client)
+        client = self._client
+        self._prime_user(client)
+        # Make sure the g object has the correct user assigned
+        self.assertEqual(g.user['username'], MockUser.username)
 
     def test_request_context(self, app: Flask):
         # Demonstration of using the test_request_context
@@ -140,5 +124,49 @@ class TestGlobals(_TestBase):
             self.assertEqual(request.endpoint, 'blog.update')
 
 
+class TestCreateAppOnce(_TestBase):
+    '''
+    Make sure `create_app_once` builds a single app for the whole class
+    and tears it down (past the `yield`) only when the class is done
+    '''
+    create_app_once = True
+    # Apps built, and apps torn down, by `create_app`
+    built = []
+    torn_down = []
+
+    def create_app(self) -> Iterator[Flask]:
+        app = build_app()
+        self.built.append(app)
+        yield app
+        self.torn_down.append(app)
+
+    def test_first(self, app: Flask):
+        self.assertEqual(self.built, [app])
+        self.assertEqual(self.torn_down, [])
+
+    def test_second(self, app: Flask):
+        self.assertEqual(self.built, [app])
+        self.assertEqual(self.torn_down, [])
+
+
+class TestCreateAppOnceTeardown(unittest.TestCase):
+    '''
+    Make sure the app shared by a `create_app_once` class is torn down exactly once, after all its tests
+    '''
+
+    def test_torn_down_after_class(self):
+        # Run a copy of TestCreateAppOnce by hand (with lists of its own) - so its `tearDownClass` is done when checked
+        class _CreateAppOnce(TestCreateAppOnce):
+            built = []
+            torn_down = []
+
+        result = unittest.TestResult()
+        unittest.defaultTestLoader.loadTestsFromTestCase(_CreateAppOnce).run(result)
+        self.assertEqual(result.testsRun, 2)
+        self.assertTrue(result.wasSuccessful())
+        self.assertEqual(len(_CreateAppOnce.built), 1)
+        self.assertEqual(_CreateAppOnce.torn_down, _CreateAppOnce.built)
+
+
 if __name__ == '__main__':
     unittest.main()
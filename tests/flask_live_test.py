@@ -1,15 +1,105 @@
-from typing import Union
+import atexit
+import os
+import tempfile
+import threading
+import unittest
+from typing import Dict, List, Union
 
 import flask_unittest
 from flask.app import Flask
+from werkzeug.security import generate_password_hash
 from selenium.webdriver import Chrome, ChromeOptions
 from selenium.webdriver.common.by import By
+from selenium.webdriver.remote.webelement import WebElement
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
-from selenium.common.exceptions import TimeoutException
+from selenium.common.exceptions import JavascriptException, TimeoutException
 
+from example.flaskr.db import get_db
 from tests.app_factory import build_app
-from tests.mockdata import MockUser, MockPosts
+from tests.mockdata import MOCK_POSTS, MockUser
+
+
+# Arguments for every Chrome the tests start - run headless, and skip the parts of Chrome's startup
+# (and background work) the tests have no use for
+# /dev/shm is often too small in the containers the tests run in
+_CHROME_ARGUMENTS = (
+    '--headless', '--no-first-run', '--no-default-browser-check', '--disable-extensions',
+    '--disable-background-networking', '--disable-sync', '--disable-renderer-backgrounding', '--disable-dev-shm-usage'
+)
+
+# Chrome refuses to start its sandbox as root - which is how CI containers usually run the tests
+# Only turn the sandbox off there, everywhere else the browser keeps it
+_NO_SANDBOX = bool(os.getenv('CI')) or (hasattr(os, 'geteuid') and os.geteuid() == 0)
+
+# The tests only look at the DOM - don't bother loading stylesheets, images or fonts
+_BLOCKED_URLS = ('*.css', '*.png', '*.jpg', '*.svg', '*.woff*', '*.ico')
+
+# The webdrivers started so far, and the one of the current thread
+# Every thread (i.e every live suite run by a ParallelTestSuite) gets its own - a browser can't be shared between them
+_drivers: List[Chrome] = []
+_drivers_lock = threading.Lock()
+_local = threading.local()
+
+
+def _chrome_options(profile: str) -> ChromeOptions:
+    # Options for every Chrome the tests start - `_CHROME_ARGUMENTS` plus the given profile directory
+    # (Not cached - the profile differs from browser to browser, and options are only built once per browser anyway)
+    options = ChromeOptions()
+    for argument in _CHROME_ARGUMENTS:
+        options.add_argument(argument)
+    if _NO_SANDBOX:
+        options.add_argument('--no-sandbox')
+    options.add_argument(f'--user-data-dir={profile}')
+    return options
+
+
+def _get_driver(port: int) -> Chrome:
+    # Start the headless Chrome of the current thread, the first time it's asked for - and reuse it afterwards
+    # Saves starting (and quitting) a whole browser for every testcase
+    driver = getattr(_local, 'driver', None)
+    if driver is None:
+        # The profile is kept across runs, so later runs start with a warm one
+        # Named after the port of the live server - every thread runs the suites of its own port, and two runs
+        # (or processes) using the same port can't be running at once anyway, so no two browsers share a profile
+        profile = os.path.join(tempfile.gettempdir(), f'flask-unittest-chrome-{port}')
+        driver = _local.driver = Chrome(options=_chrome_options(profile))
+        # Set once per browser - the blocked urls stay blocked for the rest of its session
+        driver.execute_cdp_cmd('Network.enable', {})
+        driver.execute_cdp_cmd('Network.setBlockedURLs', {'urls': list(_BLOCKED_URLS)})
+        with _drivers_lock:
+            _drivers.append(driver)
+    return driver
+
+
+@atexit.register
+def _quit_drivers():
+    # Quit all the webdrivers once the tests are done
+    with _drivers_lock:
+        while _drivers:
+            _drivers.pop().quit()
+
+
+# Fill in the form fields (by id) and submit the form with the given button - in a single webdriver call
+_FILL_AND_SUBMIT = '''
+const [fields, submit] = arguments;
+for (const [id, value] of Object.entries(fields)) {
+    document.getElementById(id).value = value;
+}
+document.querySelector(submit).click();
+'''
+
+# Whether the current page is done loading, and its (section) heading contains the given text
+_HEADING_CONTAINS = '''
+const heading = document.querySelector('body > section > header > h1');
+return document.readyState === 'complete' && heading !== null && heading.textContent.includes(arguments[0]);
+'''
+
+# Selectors for the parts of a post - the post itself is picked by its title, in `TestBlog.find_in_post`
+_CSS_POST = 'article.post'
+_CSS_POST_TITLE = 'header > div > h1'
+_CSS_POST_BODY = 'p.body'
+_CSS_POST_EDIT_LINK = 'header > a'
 
 
 class TestBase(flask_unittest.LiveTestCase):
@@ -27,67 +117,75 @@ class TestBase(flask_unittest.LiveTestCase):
     '''
     driver: Union[Chrome, None] = None
     std_wait: Union[WebDriverWait, None] = None
+    # For the checks that are expected to time out - no point waiting the full 5 seconds for those
+    fast_wait: Union[WebDriverWait, None] = None
 
-    ### setUpClass and tearDownClass for the entire class
-    # Not quite mandatory, but this is the best place to set up and tear down selenium
+    ### setUpClass for the entire class
+    # Not quite mandatory, but this is the best place to set up selenium
 
     @classmethod
     def setUpClass(cls):
-        # Initiate the selenium webdriver
-        options = ChromeOptions()
-        options.add_argument('--headless')
-        cls.driver = Chrome(options=options)
-        cls.std_wait = WebDriverWait(cls.driver, 5)
-
-    @classmethod
-    def tearDownClass(cls):
-        # Quit the webdriver
-        cls.driver.quit()
+        # Get the (shared) selenium webdriver
+        cls.driver = _get_driver(cls.app.config.get('PORT', 5000))
+        # Poll often (the default is every 0.5s) - most elements are there right away, or very soon after
+        # A script run while the page is navigating away may fail - that's just another poll, not an error
+        ignored = (JavascriptException, )
+        cls.std_wait = WebDriverWait(cls.driver, 5, poll_frequency=0.05, ignored_exceptions=ignored)
+        cls.fast_wait = WebDriverWait(cls.driver, 0.5, poll_frequency=0.02, ignored_exceptions=ignored)
+        # The browser (and its profile) outlives the testcase - drop whatever was left behind (i.e the session)
+        # `delete_all_cookies` only covers the page currently open, clear the cookies of every site instead
+        cls.driver.execute_cdp_cmd('Network.clearBrowserCookies', {})
+        # Urls of the pages visited by the helpers - the suite sets `server_url` on the class before setting it up
+        cls._url_register = f'{cls.server_url}/auth/register'
+        cls._url_login = f'{cls.server_url}/auth/login'
+        cls._url_logout = f'{cls.server_url}/auth/logout'
+        cls._url_delete = f'{cls.server_url}/auth/delete'
+        cls._url_create = f'{cls.server_url}/create'
 
     ### Helper functions (not mandatory)
 
-    def signup(self, username: str, password: str):
+    def submit_form(self, fields: Dict[str, str], submit: str = 'input[type="submit"]'):
+        # Fill in the form on the current (loaded) page, and submit it
+        # Setting the values from javascript takes one round trip - instead of a wait and `send_keys` for each field
+        self.driver.execute_script(_FILL_AND_SUBMIT, fields, submit)
+
+    def wait_for_heading(self, text: str, wait: Union[WebDriverWait, None] = None):
+        # Wait for the page (usually the one redirected to) to load, with the given text in its heading
+        # Every poll is a single script call - checking both the page load and the heading at once
+        (wait or self.std_wait).until(lambda driver: driver.execute_script(_HEADING_CONTAINS, text))
+
+    def signup(self, username: str, password: str, wait: Union[WebDriverWait, None] = None):
         # Sign up with given credentials
-        self.driver.get(f'{self.server_url}/auth/register')
-        self.std_wait.until(EC.presence_of_element_located((By.ID, 'username'))).send_keys(username)
-        self.std_wait.until(EC.presence_of_element_located((By.ID, 'password'))).send_keys(password)
-        self.std_wait.until(EC.element_to_be_clickable((By.CSS_SELECTOR, 'input[type="submit"]'))).click()
+        # `wait` is used for the final (success) check - pass `fast_wait` if the signup is expected to fail
+        self.driver.get(self._url_register)
+        self.submit_form({'username': username, 'password': password})
 
         # Make sure the signup was succesful and selenium was redirected to login page
-        self.std_wait.until(
-            EC.presence_of_element_located((By.XPATH, '/html/body/section/header/h1[contains(text(), "Log In")]'))
-        )
+        self.wait_for_heading('Log In', wait)
 
-    def login(self, username: str, password: str):
+    def login(self, username: str, password: str, wait: Union[WebDriverWait, None] = None):
         # Log in with given credentials
-        self.driver.get(f'{self.server_url}/auth/login')
-        self.std_wait.until(EC.presence_of_element_located((By.ID, 'username'))).send_keys(username)
-        self.std_wait.until(EC.presence_of_element_located((By.ID, 'password'))).send_keys(password)
-        self.std_wait.until(EC.element_to_be_clickable((By.CSS_SELECTOR, 'input[type="submit"]'))).click()
+        # `wait` is used for the final (success) check - pass `fast_wait` if the login is expected to fail
+        self.driver.get(self._url_login)
+        self.submit_form({'username': username, 'password': password})
 
         # Make sure the login was succesful and selenium was redirected to index page
-        self.std_wait.until(
-            EC.presence_of_element_located((By.XPATH, '/html/body/section/header/h1[contains(text(), "Posts")]'))
-        )
+        self.wait_for_heading('Posts', wait)
 
     def logout(self):
         # Logs out of the signed in account
-        self.driver.get(f'{self.server_url}/auth/logout')
+        self.driver.get(self._url_logout)
 
         # Make sure the logout was succesful and selenium was redirected to index page
-        self.std_wait.until(
-            EC.presence_of_element_located((By.XPATH, '/html/body/section/header/h1[contains(text(), "Posts")]'))
-        )
+        self.wait_for_heading('Posts')
 
     def delete(self):
         # Deletes the signed in account
-        self.driver.get(f'{self.server_url}/auth/delete')
+        self.driver.get(self._url_delete)
         self.std_wait.until(EC.element_to_be_clickable((By.CSS_SELECTOR, 'input[type="submit"]'))).click()
 
         # Make sure the delete was succesful and selenium was redirected to index page
-        self.std_wait.until(
-            EC.presence_of_element_located((By.XPATH, '/html/body/section/header/h1[contains(text(), "Posts")]'))
-        )
+        self.wait_for_heading('Posts')
 
 
 class TestSetup(TestBase):
@@ -114,24 +212,6 @@ class TestIndex(TestBase):
     '''
     Test the index page
     '''
-    driver: Union[Chrome, None] = None
-    std_wait: Union[WebDriverWait, None] = None
-
-    ### setUpClass and tearDownClass for the entire class
-    # Not quite mandatory, but this is the best place to set up and tear down selenium
-
-    @classmethod
-    def setUpClass(cls):
-        # Initiate the selenium webdriver
-        options = ChromeOptions()
-        options.add_argument('--headless')
-        cls.driver = Chrome(options=options)
-        cls.std_wait = WebDriverWait(cls.driver, 5)
-
-    @classmethod
-    def tearDownClass(cls):
-        # Quit the webdriver
-        cls.driver.quit()
 
     ### Test methods (mandatory, obviously)
 
@@ -175,51 +255,86 @@ class TestAuth(TestBase):
         # Register an account
         self.signup(MockUser.username, MockUser.password)
 
-        # Try registering for the same account again
-        try:
-            self.signup(MockUser.username, MockUser.password)
-            raise AssertionError('Signup should have failed')
-        except TimeoutException:
-            # Ignore the TimeoutException raised by `self.signup`
-            pass
+        # Try registering for the same account again - should never make it to the log in page
+        with self.assertRaises(TimeoutException, msg='Signup should have failed'):
+            self.signup(MockUser.username, MockUser.password, wait=self.fast_wait)
 
         # Log in and delete the account
         self.login(MockUser.username, MockUser.password)
         self.delete()
 
     def test_invalid_login(self):
-        try:
-            self.login('definitely not real', 'supah secret')
-            raise AssertionError('Login should have failed')
-        except TimeoutException:
-            # Ignore the TimeoutException raised by `self.login`
-            pass
+        with self.assertRaises(TimeoutException, msg='Login should have failed'):
+            self.login('definitely not real', 'supah secret', wait=self.fast_wait)
 
 
 class TestBlog(TestBase):
     '''
     Test the blog posts functionality of the app
     '''
-    posts = MockPosts.posts
+    posts = MOCK_POSTS
 
-    ### setUp and tearDown methods per testcase (not mandatory)
+    ### setUpClass and tearDownClass - the account is only created (and logged into) once, for the whole testcase
 
-    def setUp(self):
-        self.signup(MockUser.username, MockUser.password)
-        self.login(MockUser.username, MockUser.password)
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        # Create the account straight in the database - the signup page is tested by TestAuth
+        with cls.app.app_context():
+            db = get_db()
+            user_id = db.execute(
+                'INSERT INTO user (username, password) VALUES (?, ?)',
+                (MockUser.username, generate_password_hash(MockUser.password))
+            ).lastrowid
+            db.commit()
+        # Log in by handing the browser a session cookie signed by the app, instead of going through the log in page
+        # A cookie can only be added for the site currently open
+        cookie = cls.app.session_interface.get_signing_serializer(cls.app).dumps({'user_id': user_id})
+        cls.driver.get(cls.server_url)
+        cls.driver.add_cookie({'name': cls.app.config['SESSION_COOKIE_NAME'], 'value': cookie, 'path': '/'})
+
+    @classmethod
+    def tearDownClass(cls):
+        # Delete the shared account - the posts are already gone, they're removed after every test
+        with cls.app.app_context():
+            db = get_db()
+            db.execute('DELETE FROM user WHERE username = ?', (MockUser.username, ))
+            db.commit()
+        super().tearDownClass()
+
+    ### tearDown method per testcase (not mandatory)
 
     def tearDown(self):
-        self.delete()
+        # Only the posts change from test to test - remove the ones made by the shared account
+        with self.app.app_context():
+            db = get_db()
+            db.execute(
+                'DELETE FROM post WHERE author_id = (SELECT id FROM user WHERE username = ?)', (MockUser.username, )
+            )
+            db.commit()
 
     ### Helper functions (not mandatory)
 
+    def posts_titled(self, title: str) -> List[WebElement]:
+        # All the posts on the current page whose title contains the given text - no waiting
+        # The title is compared in python - there's no XPath to build (and escape) for every title
+        return [
+            post for post in self.driver.find_elements(By.CSS_SELECTOR, _CSS_POST)
+            if title in post.find_element(By.CSS_SELECTOR, _CSS_POST_TITLE).get_attribute('textContent')
+        ]
+
+    def find_in_post(self, title: str, selector: str) -> WebElement:
+        # Wait for the post with the given title (on the current page) to have an element matching the CSS selector
+        def _find(driver: Chrome) -> Union[WebElement, bool]:
+            posts = self.posts_titled(title)
+            matches = posts[0].find_elements(By.CSS_SELECTOR, selector) if posts else []
+            return matches[0] if matches else False
+
+        return self.std_wait.until(_find)
+
     def go_to_edit_page(self, title: str, body: str):
         # Go to the edit page of given post - located by title
-        self.std_wait.until(
-            EC.element_to_be_clickable(
-                (By.XPATH, f'/html/body/section/article[@class="post"]/header[div/h1[contains(text(), "{title}")]]/a')
-            )
-        ).click()
+        self.find_in_post(title, _CSS_POST_EDIT_LINK).click()
 
         # Make sure the pre existing values in the fields are correct
         title_field = self.std_wait.until(EC.presence_of_element_located((By.ID, 'title')))
@@ -230,23 +345,12 @@ class TestBlog(TestBase):
     def verify_post_exists(self, title: str, body: str):
         # Make sure the given post exists in the index page
         self.driver.get(self.server_url)
-        self.std_wait.until(
-            EC.presence_of_element_located(
-                (By.XPATH, f'/html/body/section/article[@class="post"]/header/div/h1[contains(text(), "{title}")]')
-            )
-        )
-        self.std_wait.until(
-            EC.presence_of_element_located(
-                (By.XPATH, f'/html/body/section/article[@class="post"]/p[contains(text(), "{body}")]')
-            )
-        )
+        self.assertIn(body, self.find_in_post(title, _CSS_POST_BODY).get_attribute('textContent'))
 
     def create_post(self, title: str, body: str):
         # Creates a post and verifies its presence on the index page
-        self.driver.get(f'{self.server_url}/create')
-        self.std_wait.until(EC.presence_of_element_located((By.ID, 'title'))).send_keys(title)
-        self.std_wait.until(EC.presence_of_element_located((By.ID, 'body'))).send_keys(body)
-        self.std_wait.until(EC.element_to_be_clickable((By.CSS_SELECTOR, 'input[type="submit"]'))).click()
+        self.driver.get(self._url_create)
+        self.submit_form({'title': title, 'body': body})
 
         # Make sure the post creation was succesful and the new post is present on the index page
         self.verify_post_exists(title, body)
@@ -256,14 +360,8 @@ class TestBlog(TestBase):
 
         # Go to the edit form page of the post
         self.go_to_edit_page(old_title, old_body)
-        # Clear the fields and edit in new data
-        title_field = self.std_wait.until(EC.presence_of_element_located((By.ID, 'title')))
-        body_field = self.std_wait.until(EC.presence_of_element_located((By.ID, 'body')))
-        title_field.clear()
-        body_field.clear()
-        title_field.send_keys(new_title)
-        body_field.send_keys(new_body)
-        self.std_wait.until(EC.element_to_be_clickable((By.CSS_SELECTOR, 'input[type="submit"][value="Save"]'))).click()
+        # Replace the fields with the new data and save
+        self.submit_form({'title': new_title, 'body': new_body}, 'input[type="submit"][value="Save"]')
 
         # Make sure the post creation was succesful and the new post is present on the index page
         self.verify_post_exists(new_title, new_body)
@@ -279,12 +377,9 @@ class TestBlog(TestBase):
         self.std_wait.until(EC.alert_is_present()).accept()
 
         # Make sure deletion was successful and the post does not exist anymore
-        try:
-            self.verify_post_exists(title, body)
-            raise AssertionError('Post should have been deleted but it was found')
-        except TimeoutException:
-            # Element does not exist - as expected
-            pass
+        # Once the index page (redirected to) has loaded, the post is either there or not - no need to wait for it
+        self.wait_for_heading('Posts')
+        self.assertEqual(self.posts_titled(title), [], 'Post should have been deleted but it was found')
 
     ### Test methods (mandatory, obviously)
 
@@ -295,40 +390,58 @@ class TestBlog(TestBase):
         self.std_wait.until(EC.element_to_be_clickable((By.LINK_TEXT, 'Delete Me!')))
         self.std_wait.until(EC.element_to_be_clickable((By.LINK_TEXT, 'New')))
 
+    def test_post_lifecycle(self):
+        # Create, edit and then delete a post - all in one go, the separate tests below only run with FULL set
+        old_title, old_body = self.posts[0]
+        new_title, new_body = self.posts[2]
+        self.create_post(old_title, old_body)
+        self.edit_post(old_title, old_body, new_title, new_body)
+        self.delete_post(new_title, new_body)
+
+    @unittest.skipUnless(os.getenv('FULL'), 'covered by test_post_lifecycle - set FULL to run it on its own')
     def test_post_creation(self):
         # Create a post and check its presentation in the index page
-        self.create_post(self.posts[0].title, self.posts[0].body)
+        title, body = self.posts[0]
+        self.create_post(title, body)
 
+    @unittest.skipUnless(os.getenv('FULL'), 'covered by test_post_lifecycle - set FULL to run it on its own')
     def test_post_edit(self):
         # Create and edit a post
-        self.create_post(self.posts[0].title, self.posts[0].body)
-        self.edit_post(self.posts[0].title, self.posts[0].body, self.posts[2].title, self.posts[2].body)
+        old_title, old_body = self.posts[0]
+        new_title, new_body = self.posts[2]
+        self.create_post(old_title, old_body)
+        self.edit_post(old_title, old_body, new_title, new_body)
 
+    @unittest.skipUnless(os.getenv('FULL'), 'covered by test_post_lifecycle - set FULL to run it on its own')
     def test_post_delete(self):
         # Create and delete a post
-        self.create_post(self.posts[1].title, self.posts[1].body)
-        self.delete_post(self.posts[1].title, self.posts[1].body)
+        title, body = self.posts[1]
+        self.create_post(title, body)
+        self.delete_post(title, body)
 
     def test_unauthorized_post_edit(self):
         # Make sure posts aren't editable by non post owners
-        self.create_post(self.posts[0].title, self.posts[0].body)
+        title, body = self.posts[0]
+        self.create_post(title, body)
 
         # Logout and check if the edit button on the post exists
         self.logout()
 
-        # Make sure the edit anchor tag does not exist
-        try:
-            self.go_to_edit_page(self.posts[0].title, self.posts[0].body)
-            raise AssertionError('Post should not be editable by logged out user')
-        except TimeoutException:
-            # Element does not exist - as expected
-            pass
+        # Make sure the post is there, but its edit anchor tag does not exist - the page has loaded by now
+        posts = self.posts_titled(title)
+        self.assertTrue(posts)
+        for post in posts:
+            self.assertEqual(
+                post.find_elements(By.CSS_SELECTOR, _CSS_POST_EDIT_LINK), [],
+                'Post should not be editable by logged out user'
+            )
 
-        # Log back in as to not screw up the tearDown
+        # Log back in for the rest of the testcase
         self.login(MockUser.username, MockUser.password)
 
 
 if __name__ == '__main__':
     # WARNING: `main_live` is currently **EXPERIMENTAL**
     # Please consider using the suite manually as seen in `tests/__init__.py`
+    # To run the live testcases side by side (on several ports), use `tests/run_tests.py` instead
     flask_unittest.main_live(build_app())
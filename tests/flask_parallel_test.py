@@ -0,0 +1,242 @@
+import os
+import socket
+import threading
+import time
+import unittest
+from concurrent.futures.process import BrokenProcessPool
+from urllib.request import urlopen
+
+import flask_unittest
+from flask.testing import FlaskClient
+
+from tests.app_factory import build_app, get_app
+
+
+class _ShardedIndex(flask_unittest.ClientTestCase):
+    '''
+    Testcase run inside the workers of `TestParallelSuite` - not meant to be added to a suite directly
+    '''
+    app = get_app()
+
+    def test_index(self, client: FlaskClient):
+        self.assertStatus(client.get('/'), 200)
+
+    @unittest.skip('checks that skips make it back to the parent')
+    def test_skipped(self, client: FlaskClient):
+        pass
+
+
+class _ShardedAuth(flask_unittest.ClientTestCase):
+    '''
+    Testcase run inside the workers of `TestParallelSuite` - not meant to be added to a suite directly
+    '''
+    app = get_app()
+
+    def test_login_page(self, client: FlaskClient):
+        self.assertStatus(client.get('/auth/login'), 200)
+
+    @unittest.expectedFailure
+    def test_missing_page(self, client: FlaskClient):
+        self.assertStatus(client.get('/this/does/not/exist'), 200)
+
+
+class _ShardedErrors(unittest.TestCase):
+    '''
+    Testcase run inside the workers of `TestParallelSuite` - not meant to be added to a suite directly
+    '''
+
+    def test_error(self):
+        raise ValueError('raised on purpose')
+
+    def test_failure(self):
+        self.fail('failed on purpose')
+
+    def test_subtests(self):
+        for i in range(3):
+            with self.subTest(i=i):
+                self.assertEqual(i, 0)
+
+
+class _ShardedBrokenFixture(unittest.TestCase):
+    '''
+    Testcase run inside the workers of `TestParallelSuite` - not meant to be added to a suite directly
+    '''
+
+    @classmethod
+    def setUpClass(cls):
+        raise ValueError('raised on purpose')
+
+    def test_never_run(self):
+        pass
+
+
+class _ShardedSlow(unittest.TestCase):
+    '''
+    Testcase run inside the workers of `TestParallelSuite` - not meant to be added to a suite directly
+    '''
+
+    def test_slow(self):
+        time.sleep(0.1)
+
+
+class _ShardedCrash(unittest.TestCase):
+    '''
+    Testcase run inside the workers of `TestParallelSuite` - not meant to be added to a suite directly
+    '''
+
+    def test_crash(self):
+        # Take the whole worker process down - not something a result can record
+        os._exit(1)
+
+
+class _ShardedUnpicklable(unittest.TestCase):
+    '''
+    Testcase run by `TestParallelSuite` - it can't be sent to a worker, so it's run in the current process
+    '''
+    # Ids of the processes the tests ran in
+    pids = []
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._lock = threading.Lock()
+
+    def test_pid(self):
+        self.pids.append(os.getpid())
+
+
+class _LiveIndex(flask_unittest.LiveTestCase):
+    '''
+    Live testcase run by `TestParallelSuite` on its own server - not meant to be added to a suite directly
+    '''
+    # Names of the threads the tests ran on
+    threads = []
+
+    @classmethod
+    def setUpClass(cls):
+        # The suite sets up the class before any of its tests run
+        cls.class_server_url = cls.server_url
+
+    def test_index(self):
+        self.threads.append(threading.current_thread().name)
+        self.assertEqual(self.class_server_url, self.server_url)
+        with urlopen(self.server_url) as rv:
+            self.assertEqual(rv.status, 200)
+
+
+class _LiveLogin(_LiveIndex):
+    '''
+    Live testcase run by `TestParallelSuite` on its own server - not meant to be added to a suite directly
+    '''
+    threads = []
+
+    def test_index(self):
+        self.threads.append(threading.current_thread().name)
+        with urlopen(f'{self.server_url}/auth/login') as rv:
+            self.assertEqual(rv.status, 200)
+
+
+def _free_port() -> int:
+    # Let the OS pick a port that's not in use
+    with socket.socket() as sckt:
+        sckt.bind(('127.0.0.1', 0))
+        return sckt.getsockname()[1]
+
+
+class TestParallelSuite(unittest.TestCase):
+    '''
+    Make sure the outcomes recorded by the worker processes are reported through the parent's result
+    '''
+
+    def _build_suite(self, *testcases: type) -> flask_unittest.ParallelTestSuite:
+        suite = flask_unittest.ParallelTestSuite(processes=2)
+        for testcase in testcases or (_ShardedIndex, _ShardedAuth):
+            suite.addTest(unittest.defaultTestLoader.loadTestsFromTestCase(testcase))
+        return suite
+
+    def test_shards_by_class(self):
+        suite = self._build_suite()
+        parallel, serial = suite._partition_tests(suite)
+        shards = suite._make_shards(parallel)
+        self.assertEqual(len(shards), 2)
+        self.assertEqual(serial, [])
+        for shard in shards:
+            self.assertEqual(len({type(test) for test in shard}), 1)
+
+    def test_results_merged(self):
+        result = unittest.TestResult()
+        self._build_suite().run(result)
+        self.assertEqual(result.testsRun, 4)
+        self.assertTrue(result.wasSuccessful())
+        self.assertEqual(len(result.skipped), 1)
+        self.assertEqual(len(result.expectedFailures), 1)
+        self.assertIsInstance(result.skipped[0][0], _ShardedIndex)
+        self.assertIsInstance(result.expectedFailures[0][0], _ShardedAuth)
+
+    def test_errors_merged(self):
+        result = unittest.TestResult()
+        self._build_suite(_ShardedIndex, _ShardedErrors).run(result)
+        self.assertEqual(result.testsRun, 5)
+        self.assertFalse(result.wasSuccessful())
+        self.assertEqual([test for test, _ in result.errors], [_ShardedErrors('test_error')])
+        self.assertIn('raised on purpose', result.errors[0][1])
+        # The failed subtests are reported as subtests - one failure each
+        failed = [str(test) for test, _ in result.failures]
+        self.assertEqual(len(failed), 3)
+        self.assertIn('failed on purpose', result.failures[0][1])
+        self.assertIn('(i=1)', failed[1])
+        self.assertIn('(i=2)', failed[2])
+
+    def test_fixture_failure_reported(self):
+        result = unittest.TestResult()
+        self._build_suite(_ShardedIndex, _ShardedBrokenFixture).run(result)
+        self.assertEqual(result.testsRun, 2)
+        self.assertEqual(len(result.errors), 1)
+        self.assertIn('setUpClass', str(result.errors[0][0]))
+        self.assertIn('raised on purpose', result.errors[0][1])
+
+    def test_failfast_stops_other_shards(self):
+        suite = flask_unittest.ParallelTestSuite(processes=2)
+        suite.addTest(_ShardedErrors('test_failure'))
+        suite.addTests(_ShardedSlow('test_slow') for _ in range(10))
+        result = unittest.TestResult()
+        result.failfast = True
+        suite.run(result)
+        self.assertEqual(len(result.failures), 1)
+        self.assertTrue(result.shouldStop)
+        self.assertLess(result.testsRun, 11)
+
+    def test_unpicklable_run_in_process(self):
+        result = unittest.TestResult()
+        self._build_suite(_ShardedIndex, _ShardedUnpicklable).run(result)
+        self.assertEqual(result.testsRun, 3)
+        self.assertTrue(result.wasSuccessful())
+        self.assertEqual(_ShardedUnpicklable.pids, [os.getpid()])
+
+    def test_worker_crash_propagates(self):
+        # Only shards that can't be pickled are run in this process - a crashed worker is an error, not a fallback
+        result = unittest.TestResult()
+        with self.assertRaises(BrokenProcessPool):
+            self._build_suite(_ShardedIndex, _ShardedCrash).run(result)
+
+    def test_live_class_on_two_ports_rejected(self):
+        # The class would get the app (and url) of whichever suite was set up last - for the tests of both suites
+        suite = flask_unittest.ParallelTestSuite()
+        for _ in range(2):
+            app = build_app({'TESTING': True, 'PORT': _free_port()})
+            suite.addTest(flask_unittest.LiveTestSuite(app, tests=[_LiveIndex('test_index')]))
+        with self.assertRaises(ValueError):
+            suite.run(unittest.TestResult())
+
+    def test_live_suites_run_side_by_side(self):
+        # Live suites with their own ports get a thread each - and their outcomes still end up in the parent's result
+        loader = unittest.defaultTestLoader
+        suite = flask_unittest.ParallelTestSuite()
+        for testcase in (_LiveIndex, _LiveLogin):
+            app = build_app({'TESTING': True, 'PORT': _free_port()})
+            suite.addTest(flask_unittest.LiveTestSuite(app, tests=[loader.loadTestsFromTestCase(testcase)]))
+        result = unittest.TestResult()
+        suite.run(result)
+        self.assertEqual(result.testsRun, 2)
+        self.assertTrue(result.wasSuccessful())
+        self.assertNotEqual(_LiveIndex.threads, _LiveLogin.threads)
+        self.assertNotIn(threading.current_thread().name, _LiveIndex.threads + _LiveLogin.threads)
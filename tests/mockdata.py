@@ -1,19 +1,20 @@
-# Just a bunch of classes containing some data to be used by the tests
+# Just a bunch of (immutable) data to be used by the tests
+from typing import NamedTuple
 
 
-class MockUser:
-    username = 'Marty_McFly'
-    password = 'Ac1d1f1c4t10n@sh4rk'
+class MockAccount(NamedTuple):
+    username: str
+    password: str
 
 
-class MockPost:
-    def __init__(self, title: str, body: str):
-        self.title = title
-        self.body = body
+class MockPost(NamedTuple):
+    title: str
+    body: str
 
 
-class MockPosts:
-    posts = (
-        MockPost('Finite time', 'Chances last a finite time'), MockPost('Walt Disney', 'Seven months of suicide'),
-        MockPost('Turned away', 'Turn back the clock\nFall onto the ground')
-    )
+MockUser = MockAccount('Marty_McFly', 'Ac1d1f1c4t10n@sh4rk')
+
+MOCK_POSTS = (
+    MockPost('Finite time', 'Chances last a finite time'), MockPost('Walt Disney', 'Seven months of suicide'),
+    MockPost('Turned away', 'Turn back the clock\nFall onto the ground')
+)
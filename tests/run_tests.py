@@ -1,12 +1,19 @@
+import os
 import unittest
 
+import flask_unittest
+
 from tests import livesuite, normalsuite
 
 
 def run():
     runner = unittest.TextTestRunner(verbosity=2)
-    runner.run(livesuite())
-    runner.run(normalsuite())
+    # Every live suite has its own server port (and every testcase its own browser) - so they can run side by side
+    # Leave a couple of cores free, same as ParallelTestSuite does for its worker processes
+    runner.run(flask_unittest.ParallelTestSuite(livesuite(max(1, (os.cpu_count() or 1) - 2))))
+    # The apps (and their in-memory databases) are built per process, and a class is never split across
+    # processes - so the testcases of the normal suite can be spread across workers without colliding
+    runner.run(flask_unittest.ParallelTestSuite(normalsuite()))
 
 
 if __name__ == '__main__':